@@ -18,14 +18,6 @@ import warnings
 warnings.filterwarnings('ignore')
 
 
-# - Import libraries, APIs and LLM
-
-# In[2]:
-
-
-from crewai import Agent, Task, Crew
-
-
 # **Note**: 
 # - The video uses `gpt-4-turbo`, but due to certain constraints, and in order to offer this course for free to everyone, the code you'll run here will use `gpt-3.5-turbo`.
 # - You can use `gpt-4-turbo` when you run the notebook _locally_ (using `gpt-4-turbo` will not work on the platform)
@@ -34,30 +26,31 @@ from crewai import Agent, Task, Crew
 # In[3]:
 
 
-import os
+from crew_factory import RequestConfig
 from utils import get_openai_api_key, get_serper_api_key
 
 openai_api_key = get_openai_api_key()
-os.environ["OPENAI_MODEL_NAME"] = 'gpt-3.5-turbo'
-os.environ["SERPER_API_KEY"] = get_serper_api_key()
+config = RequestConfig(
+    llm_provider='openai',
+    model_name='gpt-3.5-turbo',
+    openai_api_key=openai_api_key,
+    serper_api_key=get_serper_api_key()
+)
 
 
-# ## crewAI Tools
+# ## crewAI Tools, Agents and Tasks
+# 
+# - The agents, tasks and shared tools are defined once in `crew_factory.py`, which the web backend uses as well.
+# - `build_crew` binds them to this run's inputs: the job posting, the profile URL and the resume to search.
 
 # In[4]:
 
 
-from crewai_tools import (
-  FileReadTool,
-  ScrapeWebsiteTool,
-  MDXSearchTool,
-  SerperDevTool
-)
+from crew_factory import AGENT_SPECS, build_crew
+from resume_index import build_resume_search_tool
 
-search_tool = SerperDevTool()
-scrape_tool = ScrapeWebsiteTool()
-read_resume = FileReadTool(file_path='./fake_resume.md')
-semantic_search_resume = MDXSearchTool(mdx='./fake_resume.md')
+for name, spec in AGENT_SPECS.items():
+    print(f"{name}: {spec['role']} (tools: {', '.join(spec['tools'])})")
 
 
 # - Uncomment and run the cell below if you wish to view `fake_resume.md` in the notebook.
@@ -69,212 +62,11 @@ from IPython.display import Markdown, display
 display(Markdown("./fake_resume.md"))
 
 
-# ## Creating Agents
-
-# In[6]:
-
-
-# Agent 1: Researcher
-researcher = Agent(
-    role="Tech Job Researcher",
-    goal="Make sure to do amazing analysis on "
-         "job posting to help job applicants",
-    tools = [scrape_tool, search_tool],
-    verbose=True,
-    backstory=(
-        "As a Job Researcher, your prowess in "
-        "navigating and extracting critical "
-        "information from job postings is unmatched."
-        "Your skills help pinpoint the necessary "
-        "qualifications and skills sought "
-        "by employers, forming the foundation for "
-        "effective application tailoring."
-    )
-)
-
-
-# In[7]:
-
-
-# Agent 2: Profiler
-profiler = Agent(
-    role="Personal Profiler for Engineers",
-    goal="Do increditble research on job applicants "
-         "to help them stand out in the job market",
-    tools = [scrape_tool, search_tool,
-             read_resume, semantic_search_resume],
-    verbose=True,
-    backstory=(
-        "Equipped with analytical prowess, you dissect "
-        "and synthesize information "
-        "from diverse sources to craft comprehensive "
-        "personal and professional profiles, laying the "
-        "groundwork for personalized resume enhancements."
-    )
-)
-
-
-# In[ ]:
-
-
-# Agent 3: Resume Strategist
-resume_strategist = Agent(
-    role="Resume Strategist for Engineers",
-    goal="Find all the best ways to make a "
-         "resume stand out in the job market.",
-    tools = [scrape_tool, search_tool,
-             read_resume, semantic_search_resume],
-    verbose=True,
-    backstory=(
-        "With a strategic mind and an eye for detail, you "
-        "excel at refining resumes to highlight the most "
-        "relevant skills and experiences, ensuring they "
-        "resonate perfectly with the job's requirements."
-    )
-)
-
-
-# In[ ]:
-
-
-# Agent 4: Interview Preparer
-interview_preparer = Agent(
-    role="Engineering Interview Preparer",
-    goal="Create interview questions and talking points "
-         "based on the resume and job requirements",
-    tools = [scrape_tool, search_tool,
-             read_resume, semantic_search_resume],
-    verbose=True,
-    backstory=(
-        "Your role is crucial in anticipating the dynamics of "
-        "interviews. With your ability to formulate key questions "
-        "and talking points, you prepare candidates for success, "
-        "ensuring they can confidently address all aspects of the "
-        "job they are applying for."
-    )
-)
-
-
-# ## Creating Tasks
-
-# In[ ]:
-
-
-# Task for Researcher Agent: Extract Job Requirements
-research_task = Task(
-    description=(
-        "Analyze the job posting URL provided ({job_posting_url}) "
-        "to extract key skills, experiences, and qualifications "
-        "required. Use the tools to gather content and identify "
-        "and categorize the requirements."
-    ),
-    expected_output=(
-        "A structured list of job requirements, including necessary "
-        "skills, qualifications, and experiences."
-    ),
-    agent=researcher,
-    async_execution=True
-)
-
-
-# In[ ]:
-
-
-# Task for Profiler Agent: Compile Comprehensive Profile
-profile_task = Task(
-    description=(
-        "Compile a detailed personal and professional profile "
-        "using the GitHub ({github_url}) URLs, and personal write-up "
-        "({personal_writeup}). Utilize tools to extract and "
-        "synthesize information from these sources."
-    ),
-    expected_output=(
-        "A comprehensive profile document that includes skills, "
-        "project experiences, contributions, interests, and "
-        "communication style."
-    ),
-    agent=profiler,
-    async_execution=True
-)
-
-
-# - You can pass a list of tasks as `context` to a task.
-# - The task then takes into account the output of those tasks in its execution.
-# - The task will not run until it has the output(s) from those tasks.
-
-# In[ ]:
-
-
-# Task for Resume Strategist Agent: Align Resume with Job Requirements
-resume_strategy_task = Task(
-    description=(
-        "Using the profile and job requirements obtained from "
-        "previous tasks, tailor the resume to highlight the most "
-        "relevant areas. Employ tools to adjust and enhance the "
-        "resume content. Make sure this is the best resume even but "
-        "don't make up any information. Update every section, "
-        "inlcuding the initial summary, work experience, skills, "
-        "and education. All to better reflrect the candidates "
-        "abilities and how it matches the job posting."
-    ),
-    expected_output=(
-        "An updated resume that effectively highlights the candidate's "
-        "qualifications and experiences relevant to the job."
-    ),
-    output_file="tailored_resume.md",
-    context=[research_task, profile_task],
-    agent=resume_strategist
-)
-
-
-# In[ ]:
-
-
-# Task for Interview Preparer Agent: Develop Interview Materials
-interview_preparation_task = Task(
-    description=(
-        "Create a set of potential interview questions and talking "
-        "points based on the tailored resume and job requirements. "
-        "Utilize tools to generate relevant questions and discussion "
-        "points. Make sure to use these question and talking points to "
-        "help the candiadte highlight the main points of the resume "
-        "and how it matches the job posting."
-    ),
-    expected_output=(
-        "A document containing key questions and talking points "
-        "that the candidate should prepare for the initial interview."
-    ),
-    output_file="interview_materials.md",
-    context=[research_task, profile_task, resume_strategy_task],
-    agent=interview_preparer
-)
-
-
-# ## Creating the Crew
-
-# In[ ]:
-
-
-job_application_crew = Crew(
-    agents=[researcher,
-            profiler,
-            resume_strategist,
-            interview_preparer],
-
-    tasks=[research_task,
-           profile_task,
-           resume_strategy_task,
-           interview_preparation_task],
-
-    verbose=True
-)
-
-
 # ## Running the Crew
 # 
 # - Set the inputs for the execution of the crew.
 
-# In[ ]:
+# In[6]:
 
 
 job_application_inputs = {
@@ -291,6 +83,24 @@ job_application_inputs = {
 }
 
 
+# - The resume strategy and interview preparation tasks write `tailored_resume.md` and `interview_materials.md` to the current directory.
+
+# In[7]:
+
+
+with open('./fake_resume.md') as f:
+    semantic_search_resume = build_resume_search_tool(f.read(), openai_api_key)
+
+job_application_crew, tasks = build_crew(
+    job_posting_url=job_application_inputs['job_posting_url'],
+    profile_url=job_application_inputs['github_url'],
+    resume_path='./fake_resume.md',
+    semantic_search_resume=semantic_search_resume,
+    output_dir='.',
+    config=config
+)
+
+
 # **Note**: LLMs can provide different outputs for they same input, so what you get might be different than what you see in the video.
 
 # In[ ]:
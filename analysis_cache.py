@@ -0,0 +1,26 @@
+import hashlib
+import os
+
+from scrape_cache import normalize_url
+from storage import DiskCache
+
+ANALYSIS_CACHE_TTL = int(os.environ.get("ANALYSIS_CACHE_TTL", 24 * 3600))
+ANALYSIS_CACHE_MAX_BYTES = int(os.environ.get("ANALYSIS_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+
+# Job requirements produced by research_task, shared by every request that
+# tailors against the same posting with the same model
+requirements_cache = DiskCache(
+    "requirements", ttl=ANALYSIS_CACHE_TTL, max_bytes=ANALYSIS_CACHE_MAX_BYTES
+)
+
+
+def requirements_key(job_posting_url, posting_text, llm_provider, model_name):
+    """
+    Cache key for the requirements of a posting. Keyed on the page content
+    as well as the URL so an edited posting is analysed again, and two
+    postings whose pages extract to the same text (shells rendered by
+    JavaScript, "no longer available" pages) don't share an analysis.
+    """
+    page = f"{normalize_url(job_posting_url)}\n{posting_text}"
+    digest = hashlib.sha256(page.encode("utf-8")).hexdigest()
+    return f"{llm_provider}:{model_name or 'default'}:{digest}"
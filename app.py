@@ -1,237 +1,787 @@
 import os
 import json
+import hashlib
 import tempfile
-from flask import Flask, request, jsonify
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import warnings
 warnings.filterwarnings('ignore')
 
-from crewai import Agent, Task, Crew
-from crewai_tools import (
-    FileReadTool,
-    ScrapeWebsiteTool,
-    MDXSearchTool,
-    SerperDevTool
+import metrics
+from crew_specs import (
+    AGENT_SPECS, ALL_STAGES, DEFAULT_PIPELINE, MATCH_HINT_NOTE, MODEL_TIERS, PIPELINES, RETAILOR_NOTE
+)
+from jobs import AdmissionError, ClientLimiter, JobQueue
+from extraction import MIN_CONTENT_CHARS
+from scrape_cache import fetch_page
+from analysis_cache import requirements_cache, requirements_key
+from checkpoints import StageCheckpoints, checkpoint_key, valid_request_id
+from compression import compress_response, etag_variants
+from match_score import score_posting, score_postings
+from results import ARTIFACTS, RESULT_TTL, load_result, store_result
+from schemas import TailoredResume
+from retailor import (
+    diff_sections, has_sections, load_session, merge_sections, save_session, session_key,
+    split_sections
 )
 
 app = Flask(__name__)
 CORS(app)
 
+job_queue = JobQueue()
+metrics.Gauge("crew_jobs_queued", "Jobs waiting for a worker.", job_queue.queued_count)
+metrics.Gauge("crew_jobs_running", "Jobs being worked on.", job_queue.running_count)
+metrics.Gauge("crew_crews_running", "Crews running, batch postings included.", job_queue.crew_count)
+
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", 4))
+BATCH_MAX_POSTINGS = int(os.environ.get("BATCH_MAX_POSTINGS", 30))
+# /api/match-score fetches pages for anyone without a key, so it is limited
+# per client (postings per second, with bursts of a full batch) and overall
+match_score_limiter = ClientLimiter(
+    "match_score",
+    max_concurrent=int(os.environ.get("MATCH_SCORE_CONCURRENCY", 4)),
+    rate=float(os.environ.get("MATCH_SCORE_RATE", 0.5)),
+    burst=int(os.environ.get("MATCH_SCORE_BURST", BATCH_MAX_POSTINGS)),
+)
+RESULTS_PAGE_SIZE = int(os.environ.get("RESULTS_PAGE_SIZE", 10))
+
+# crewai, its tools and langchain take seconds to import. By default they
+# are imported by the first crew run, so workers come up healthy quickly;
+# with PRELOAD_CREW=1 they are imported with the app instead, which under
+# `gunicorn --preload` happens once in the master and is shared by every
+# forked worker.
+PRELOAD_CREW = os.environ.get("PRELOAD_CREW", "0") == "1"
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy"}), 200
 
-@app.route('/api/generate-resume', methods=['POST'])
-def generate_resume():
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Stage, tool, LLM and cache metrics in Prometheus text format."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.after_request
+def compress(response):
+    return compress_response(response, request.headers.get('Accept-Encoding'))
+
+def _parse_request(data, batch=False):
+    """
+    Validate a generate request and return (params, error_response).
+
+    Batch requests carry a `jobPostingUrls` list instead of `jobPostingUrl`.
+    """
+    data = data or {}
+
+    # Extract API keys, URLs and LLM provider
+    params = {
+        'llm_provider': data.get('llmProvider', 'openai'),  # Default to OpenAI if not specified
+        'openai_api_key': data.get('openaiApiKey'),
+        'anthropic_api_key': data.get('anthropicApiKey'),
+        'serper_api_key': data.get('serperApiKey'),
+        'job_posting_url': data.get('jobPostingUrl'),
+        'linkedin_url': data.get('linkedinUrl'),
+        'personal_writeup': data.get('personalWriteup'),
+        'model_name': data.get('modelName'),  # Per-agent model tiers if not specified
+        'pipeline_mode': data.get('pipelineMode') or DEFAULT_PIPELINE,
+        'retailor': bool(data.get('retailor')),  # Only redo what the write-up edit affects
+        'request_id': data.get('requestId'),  # Retries with the same ID resume finished stages
+    }
+
+    if batch:
+        urls = data.get('jobPostingUrls')
+        if not isinstance(urls, list) or not all(isinstance(url, str) and url for url in urls):
+            urls = []
+        params['job_posting_urls'] = list(dict.fromkeys(urls))
+        params['job_posting_url'] = urls[0] if urls else None
+        params['include_interview_materials'] = bool(data.get('includeInterviewMaterials'))
+
+        if len(params['job_posting_urls']) > BATCH_MAX_POSTINGS:
+            return None, (jsonify({
+                "error": "Too many job postings",
+                "message": f"Please submit at most {BATCH_MAX_POSTINGS} job postings per batch"
+            }), 400)
+
+    if params['pipeline_mode'] not in PIPELINES:
+        return None, (jsonify({
+            "error": "Invalid pipeline mode",
+            "message": f"pipelineMode must be one of: {', '.join(PIPELINES)}"
+        }), 400)
+
+    if params['llm_provider'] not in MODEL_TIERS:
+        return None, (jsonify({
+            "error": "Invalid LLM provider",
+            "message": f"llmProvider must be one of: {', '.join(MODEL_TIERS)}"
+        }), 400)
+
+    if params['request_id'] is not None and not valid_request_id(params['request_id']):
+        return None, (jsonify({
+            "error": "Invalid request ID",
+            "message": "requestId must be 8 to 128 letters, digits or the characters _ . : -"
+        }), 400)
+
+    # Validate inputs
+    if (not params['serper_api_key'] or not params['job_posting_url']
+            or not params['linkedin_url'] or not params['personal_writeup']):
+        return None, (jsonify({
+            "error": "Missing required fields",
+            "message": "Please provide all required information"
+        }), 400)
+
+    # Validate that the appropriate API key is provided based on provider
+    if params['llm_provider'] == 'openai' and not params['openai_api_key']:
+        return None, (jsonify({
+            "error": "Missing OpenAI API key",
+            "message": "Please provide an OpenAI API key"
+        }), 400)
+    elif params['llm_provider'] == 'anthropic' and not params['anthropic_api_key']:
+        return None, (jsonify({
+            "error": "Missing Anthropic API key",
+            "message": "Please provide an Anthropic API key"
+        }), 400)
+
+    return params, None
+
+def _dedupe_key(func, params):
+    """
+    Identical submissions (double clicks, impatient retries) with the same
+    API key share one run, so nobody gets a result paid for by someone
+    else's key. Only the key's hash goes in.
+    """
+    run = json.dumps([
+        func.__name__,
+        params['llm_provider'],
+        params.get('model_name') or "default",
+        params.get('job_posting_urls') or params['job_posting_url'],
+        params['linkedin_url'],
+        params['personal_writeup'],
+        params['pipeline_mode'],
+        params['retailor'],
+        params.get('include_interview_materials'),
+        _quota_key(params),
+    ])
+    return hashlib.sha256(run.encode("utf-8")).hexdigest()
+
+def _quota_key(params):
+    """Jobs are counted against the LLM API key paying for them; only its hash is kept."""
+    api_key = params['anthropic_api_key'] if params['llm_provider'] == 'anthropic' \
+        else params['openai_api_key']
+    return hashlib.sha256(f"{params['llm_provider']}:{api_key}".encode("utf-8")).hexdigest()
+
+def _resume_key(func, params):
+    """
+    A retried request reattaches to its job only when the request ID, the
+    inputs and the API key all match, so a request ID is never a handle on
+    someone else's job.
+    """
+    if not params.get('request_id'):
+        return None
+    run = json.dumps([
+        func.__name__,
+        checkpoint_key(params['request_id'], params, params['job_posting_url']),
+        params.get('job_posting_urls'),
+        _quota_key(params),
+    ])
+    return hashlib.sha256(run.encode("utf-8")).hexdigest()
+
+def _submit(func, params, priority="interactive"):
+    return job_queue.submit(
+        func, params, resume_key=_resume_key(func, params), dedupe_key=_dedupe_key(func, params),
+        priority=priority, quota_key=_quota_key(params)
+    )
+
+def _busy(e):
+    """429 with a Retry-After hint for a submission admission control turned away."""
+    return jsonify({
+        "error": "Too many requests",
+        "message": f"{str(e)} (retry in {e.retry_after} s)",
+        "retryAfter": e.retry_after
+    }), 429, {'Retry-After': str(e.retry_after)}
+
+def _request_config(params):
+    # crewai and its tools are imported on first use unless PRELOAD_CREW is set
+    from crew_factory import RequestConfig
+
+    # Keys and model stay with this request instead of going through os.environ
+    return RequestConfig(
+        llm_provider=params['llm_provider'],
+        model_name=params.get('model_name'),
+        openai_api_key=params['openai_api_key'],
+        anthropic_api_key=params['anthropic_api_key'],
+        serper_api_key=params['serper_api_key'],
+    )
+
+def _stored(result):
+    """Keep a finished result so it can be fetched again by its `resultId`."""
+    return dict(result, resultId=store_result(result))
+
+def _resume_sections(tailored_resume):
     try:
-        data = request.json
-        
-        # Extract API keys, URLs and LLM provider
-        llm_provider = data.get('llmProvider', 'openai')  # Default to OpenAI if not specified
-        openai_api_key = data.get('openaiApiKey')
-        anthropic_api_key = data.get('anthropicApiKey')
-        serper_api_key = data.get('serperApiKey')
-        job_posting_url = data.get('jobPostingUrl')
-        linkedin_url = data.get('linkedinUrl')
-        personal_writeup = data.get('personalWriteup')
-        
-        # Validate inputs
-        if not serper_api_key or not job_posting_url or not linkedin_url or not personal_writeup:
-            return jsonify({
-                "error": "Missing required fields", 
-                "message": "Please provide all required information"
-            }), 400
-            
-        # Validate that the appropriate API key is provided based on provider
-        if llm_provider == 'openai' and not openai_api_key:
-            return jsonify({
-                "error": "Missing OpenAI API key", 
-                "message": "Please provide an OpenAI API key"
-            }), 400
-        elif llm_provider == 'anthropic' and not anthropic_api_key:
-            return jsonify({
-                "error": "Missing Anthropic API key", 
-                "message": "Please provide an Anthropic API key"
-            }), 400
-            
-        # Set environment variables based on provider
-        if llm_provider == 'openai':
-            os.environ["OPENAI_API_KEY"] = openai_api_key
-            os.environ["OPENAI_MODEL_NAME"] = 'gpt-4-turbo'
-        elif llm_provider == 'anthropic':
-            os.environ["ANTHROPIC_API_KEY"] = anthropic_api_key
-            
-        os.environ["SERPER_API_KEY"] = serper_api_key
-        
+        return TailoredResume.parse(tailored_resume).model_dump()["sections"]
+    except ValueError:
+        return []
+
+def _run_crew(job_posting_url, linkedin_url, personal_writeup, resume_path, semantic_search_resume,
+              config, emit=None, completed=None, stages=ALL_STAGES, pipeline="strict",
+              notes=None):
+    """
+    Run the given stages for one job posting and return the crew's tasks.
+
+    The requirements analysis is taken from the cache when this posting was
+    analysed before, and stored there after a fresh analysis. Otherwise the
+    research task gets the extracted posting text up front. Error pages and
+    near-empty pages are never looked up, cached or handed over, since they
+    look alike across postings. The resume
+    strategist gets the local match score of the posting as a hint.
+    """
+    from crew_factory import build_crew
+
+    completed = dict(completed or {})
+    notes = dict(notes or {})
+
+    # Reuse the requirements analysis if this posting was analysed before
+    research_key = None
+    posting_text = None
+    if "research" in stages and "research" not in completed:
+        research_output = None
+        try:
+            page_text, ok = fetch_page(job_posting_url)
+            if ok and len(page_text) >= MIN_CONTENT_CHARS:
+                posting_text = page_text
+                research_key = requirements_key(
+                    job_posting_url, posting_text, config.llm_provider,
+                    config.model_for(AGENT_SPECS["researcher"]["tier"])
+                )
+                research_output = requirements_cache.get(research_key)
+        except Exception as e:
+            print(f"Skipping requirements cache: {str(e)}")
+
+        if research_output is not None:
+            completed["research"] = research_output
+            if emit:
+                emit("task_finished", {"stage": "research", "output": research_output, "cached": True})
+
+    if "resume_strategy" in stages and "resume_strategy" not in completed:
+        try:
+            page_text = posting_text
+            if page_text is None:
+                page_text, ok = fetch_page(job_posting_url)
+                if not ok:
+                    raise ValueError("the posting answered with an error")
+            match = score_posting(personal_writeup, page_text)
+            if match["matchedSkills"] or match["missingSkills"]:
+                notes["resume_strategy"] = MATCH_HINT_NOTE.format(
+                    matched=", ".join(match["matchedSkills"]) or "none",
+                    missing=", ".join(match["missingSkills"]) or "nothing else",
+                ) + notes.get("resume_strategy", "")
+        except Exception as e:
+            print(f"Skipping match hint: {str(e)}")
+
+    job_application_crew, tasks = build_crew(
+        job_posting_url, linkedin_url, resume_path, semantic_search_resume,
+        config=config, emit=emit, completed=completed, stages=stages, pipeline=pipeline,
+        posting_text=posting_text, notes=notes
+    )
+
+    # Execute crew with inputs
+    job_application_inputs = {
+        'job_posting_url': job_posting_url,
+        'github_url': linkedin_url,  # Using LinkedIn URL as GitHub URL for compatibility
+        'personal_writeup': personal_writeup
+    }
+
+    job_application_crew.kickoff(inputs=job_application_inputs)
+
+    if research_key and "research" not in completed and tasks["research"].output is not None:
+        requirements_cache.set(research_key, tasks["research"].output.raw_output)
+
+    return tasks
+
+def _checkpoints(params, job_posting_url=None):
+    if not params.get('request_id'):
+        return StageCheckpoints()
+    return StageCheckpoints(checkpoint_key(params['request_id'], params, job_posting_url))
+
+def _stage_names(pipeline, stages=ALL_STAGES):
+    return [stage for stage, spec in PIPELINES[pipeline].items() if spec.get("part_of", stage) in stages]
+
+def run_job_application_crew(params, emit=None):
+    """
+    Run the full crew for one request and return the generated documents.
+
+    `emit(event, data)` is called as each task starts and finishes. With
+    `retailor` set and a previous run for the same posting, profile and
+    model on record, only the edited sections of the resume are redone.
+
+    With a `request_id`, every finished stage is checkpointed and a retry
+    of the same request only runs the stages that had not finished.
+    """
+    from resume_index import build_resume_search_tool
+
+    config = _request_config(params)
+    personal_writeup = params['personal_writeup']
+    session = session_key(
+        params['job_posting_url'], params['linkedin_url'], config.llm_provider, config.model_name,
+        _quota_key(params)
+    )
+    previous = load_session(session) if params['retailor'] else None
+    if previous is not None:
+        return _retailor(params, config, session, previous, emit=emit)
+
+    checkpoints = _checkpoints(params, params['job_posting_url'])
+    outputs = checkpoints.resume(_stage_names(params['pipeline_mode']), emit)
+
+    if all(stage in outputs for stage in ALL_STAGES):
+        # Everything finished before, only the response got lost
+        tailored_resume = outputs["resume_strategy"]
+        interview_materials = outputs["interview_preparation"]
+    else:
         # Create temporary directory to store resume file
         with tempfile.TemporaryDirectory() as temp_dir:
             # Create temporary resume file
             resume_path = os.path.join(temp_dir, 'resume.md')
             with open(resume_path, 'w') as f:
                 f.write(personal_writeup)
-            
-            # Initialize tools
-            search_tool = SerperDevTool()
-            scrape_tool = ScrapeWebsiteTool()
-            read_resume = FileReadTool(file_path=resume_path)
-            semantic_search_resume = MDXSearchTool(mdx=resume_path)
-            
-            # Create agents with the specified LLM provider
-            researcher = Agent(
-                role="Tech Job Researcher",
-                goal="Make sure to do amazing analysis on job posting to help job applicants",
-                tools=[scrape_tool, search_tool],
-                verbose=True,
-                llm_provider=llm_provider,  # Set LLM provider
-                backstory=(
-                    "As a Job Researcher, your prowess in navigating and extracting critical "
-                    "information from job postings is unmatched. Your skills help pinpoint the necessary "
-                    "qualifications and skills sought by employers, forming the foundation for "
-                    "effective application tailoring."
-                )
-            )
-            
-            profiler = Agent(
-                role="Personal Profiler for Engineers",
-                goal="Do increditble research on job applicants to help them stand out in the job market",
-                tools=[scrape_tool, search_tool, read_resume, semantic_search_resume],
-                verbose=True,
-                llm_provider=llm_provider,  # Set LLM provider
-                backstory=(
-                    "Equipped with analytical prowess, you dissect and synthesize information "
-                    "from diverse sources to craft comprehensive personal and professional profiles, "
-                    "laying the groundwork for personalized resume enhancements."
-                )
-            )
-            
-            resume_strategist = Agent(
-                role="Resume Strategist for Engineers",
-                goal="Find all the best ways to make a resume stand out in the job market.",
-                tools=[scrape_tool, search_tool, read_resume, semantic_search_resume],
-                verbose=True,
-                llm_provider=llm_provider,  # Set LLM provider
-                backstory=(
-                    "With a strategic mind and an eye for detail, you excel at refining resumes "
-                    "to highlight the most relevant skills and experiences, ensuring they "
-                    "resonate perfectly with the job's requirements."
-                )
-            )
-            
-            interview_preparer = Agent(
-                role="Engineering Interview Preparer",
-                goal="Create interview questions and talking points based on the resume and job requirements",
-                tools=[scrape_tool, search_tool, read_resume, semantic_search_resume],
-                verbose=True,
-                llm_provider=llm_provider,  # Set LLM provider
-                backstory=(
-                    "Your role is crucial in anticipating the dynamics of interviews. "
-                    "With your ability to formulate key questions and talking points, "
-                    "you prepare candidates for success, ensuring they can confidently "
-                    "address all aspects of the job they are applying for."
-                )
-            )
-            
-            # Create tasks
-            research_task = Task(
-                description=(
-                    f"Analyze the job posting URL provided ({job_posting_url}) "
-                    "to extract key skills, experiences, and qualifications required. "
-                    "Use the tools to gather content and identify and categorize the requirements."
-                ),
-                expected_output=(
-                    "A structured list of job requirements, including necessary skills, "
-                    "qualifications, and experiences."
-                ),
-                agent=researcher,
-                async_execution=True
+
+            # Embeddings come from the persistent index, so only new or edited
+            # chunks of the write-up are sent to the embedding API
+            semantic_search_resume = build_resume_search_tool(
+                personal_writeup, params['openai_api_key']
             )
-            
-            profile_task = Task(
-                description=(
-                    f"Compile a detailed personal and professional profile using the "
-                    f"LinkedIn profile ({linkedin_url}), and personal write-up. "
-                    "Utilize tools to extract and synthesize information from these sources."
-                ),
-                expected_output=(
-                    "A comprehensive profile document that includes skills, project experiences, "
-                    "contributions, interests, and communication style."
-                ),
-                agent=profiler,
-                async_execution=True
+
+            tasks = _run_crew(
+                params['job_posting_url'], params['linkedin_url'], personal_writeup, resume_path,
+                semantic_search_resume, config, emit=checkpoints.wrap(emit),
+                completed=outputs, pipeline=params['pipeline_mode']
             )
-            
-            # Create tasks with context
-            tailored_resume_path = os.path.join(temp_dir, 'tailored_resume.md')
-            resume_strategy_task = Task(
-                description=(
-                    "Using the profile and job requirements obtained from previous tasks, "
-                    "tailor the resume to highlight the most relevant areas. Employ tools "
-                    "to adjust and enhance the resume content. Make sure this is the best "
-                    "resume even but don't make up any information. Update every section, "
-                    "including the initial summary, work experience, skills, and education. "
-                    "All to better reflect the candidates abilities and how it matches the job posting."
-                ),
-                expected_output=(
-                    "An updated resume that effectively highlights the candidate's "
-                    "qualifications and experiences relevant to the job."
-                ),
-                output_file=tailored_resume_path,
-                context=[research_task, profile_task],
-                agent=resume_strategist
+
+            outputs = {stage: task.output.raw_output for stage, task in tasks.items()}
+            tailored_resume = outputs["resume_strategy"]
+            interview_materials = outputs["interview_preparation"]
+
+    save_session(
+        session, personal_writeup, outputs["research"], outputs["profile"],
+        tailored_resume, interview_materials
+    )
+
+    return _stored({
+        "status": "success",
+        "tailoredResume": tailored_resume,
+        "tailoredResumeSections": _resume_sections(tailored_resume),
+        "interviewMaterials": interview_materials,
+        "researchNotes": outputs["research"],
+        "provider": config.llm_provider
+    })
+
+def _retailor(params, config, session, previous, emit=None):
+    """
+    Rewrite only the resume sections whose write-up sections changed since
+    the previous run, reusing its research, profile, unchanged resume
+    sections and interview materials. When either write-up has no
+    sections, an edit rewrites the whole resume instead.
+    """
+    from resume_index import build_resume_search_tool
+
+    personal_writeup = params['personal_writeup']
+    changed, removed = diff_sections(previous['writeup'], personal_writeup)
+    rewrite_all = bool(changed or removed) and not (
+        has_sections(previous['writeup']) and has_sections(personal_writeup)
+    )
+
+    def reuse(stage, output):
+        if emit:
+            emit("task_finished", {"stage": stage, "output": output, "cached": True})
+
+    reuse("research", previous['research'])
+    reuse("profile", previous['profile'])
+
+    rewritten = ""
+    if changed or rewrite_all:
+        notes = {}
+        if not rewrite_all:
+            writeup_sections = split_sections(personal_writeup)
+            resume_sections = split_sections(previous['tailoredResume'])
+            notes["resume_strategy"] = RETAILOR_NOTE.format(
+                sections=", ".join(changed),
+                writeup_sections="\n\n".join(writeup_sections[key] for key in changed),
+                resume_sections="\n\n".join(
+                    resume_sections[key] for key in changed if key in resume_sections
+                ) or "(none yet)"
             )
-            
-            interview_materials_path = os.path.join(temp_dir, 'interview_materials.md')
-            interview_preparation_task = Task(
-                description=(
-                    "Create a set of potential interview questions and talking points "
-                    "based on the tailored resume and job requirements. Utilize tools to "
-                    "generate relevant questions and discussion points. Make sure to use "
-                    "these question and talking points to help the candidate highlight the "
-                    "main points of the resume and how it matches the job posting."
-                ),
-                expected_output=(
-                    "A document containing key questions and talking points that the "
-                    "candidate should prepare for the initial interview."
-                ),
-                output_file=interview_materials_path,
-                context=[research_task, profile_task, resume_strategy_task],
-                agent=interview_preparer
+        with tempfile.TemporaryDirectory() as temp_dir:
+            resume_path = os.path.join(temp_dir, 'resume.md')
+            with open(resume_path, 'w') as f:
+                f.write(personal_writeup)
+
+            semantic_search_resume = build_resume_search_tool(
+                personal_writeup, params['openai_api_key']
             )
-            
-            # Create and run crew
-            job_application_crew = Crew(
-                agents=[researcher, profiler, resume_strategist, interview_preparer],
-                tasks=[research_task, profile_task, resume_strategy_task, interview_preparation_task],
-                verbose=True
+            tasks = _run_crew(
+                params['job_posting_url'], params['linkedin_url'], personal_writeup, resume_path,
+                semantic_search_resume, config, emit=emit,
+                completed={"research": previous['research'], "profile": previous['profile']},
+                stages=("resume_strategy",), notes=notes
             )
-            
-            # Execute crew with inputs
-            job_application_inputs = {
-                'job_posting_url': job_posting_url,
-                'github_url': linkedin_url,  # Using LinkedIn URL as GitHub URL for compatibility
-                'personal_writeup': personal_writeup
-            }
-            
-            result = job_application_crew.kickoff(inputs=job_application_inputs)
-            
-            # Read output files
-            with open(tailored_resume_path, 'r') as f:
-                tailored_resume = f.read()
-                
-            with open(interview_materials_path, 'r') as f:
-                interview_materials = f.read()
-            
-            # Return results
-            return jsonify({
-                "status": "success",
-                "tailoredResume": tailored_resume,
-                "interviewMaterials": interview_materials,
-                "provider": llm_provider
-            }), 200
-            
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        return jsonify({"error": "Server error", "message": str(e)}), 500
+            rewritten = tasks["resume_strategy"].output.raw_output
+
+    if rewrite_all:
+        tailored_resume = rewritten
+        changed, removed = list(split_sections(tailored_resume)), []
+    else:
+        tailored_resume = merge_sections(previous['tailoredResume'], rewritten, changed, removed)
+    if not changed:
+        reuse("resume_strategy", tailored_resume)
+    reuse("interview_preparation", previous['interviewMaterials'])
+
+    save_session(
+        session, personal_writeup, previous['research'], previous['profile'],
+        tailored_resume, previous['interviewMaterials']
+    )
+    return _stored({
+        "status": "success",
+        "tailoredResume": tailored_resume,
+        "tailoredResumeSections": _resume_sections(tailored_resume),
+        "interviewMaterials": previous['interviewMaterials'],
+        "researchNotes": previous['research'],
+        "provider": config.llm_provider,
+        "retailoredSections": changed + removed
+    })
+
+def run_batch(params, emit=None):
+    """
+    Tailor one profile against many job postings.
+
+    The profile is compiled once; research and resume strategy (plus
+    interview preparation if requested) then run for each posting on a
+    pool of BATCH_CONCURRENCY threads. Every crew takes one of the job
+    queue's crew slots, so batches stay within JOB_WORKERS crews together
+    with single runs. Each posting reports `posting_finished` with its
+    result as soon as it is done.
+    """
+    from resume_index import build_resume_search_tool
+
+    config = _request_config(params)
+    personal_writeup = params['personal_writeup']
+    linkedin_url = params['linkedin_url']
+    urls = params['job_posting_urls']
+    stages = ("research", "resume_strategy")
+    if params['include_interview_materials']:
+        stages += ("interview_preparation",)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        resume_path = os.path.join(temp_dir, 'resume.md')
+        with open(resume_path, 'w') as f:
+            f.write(personal_writeup)
+
+        semantic_search_resume = build_resume_search_tool(
+            personal_writeup, params['openai_api_key']
+        )
+
+        # The profile only depends on the candidate, so compile it once
+        profile_checkpoints = _checkpoints(params)
+        profile_output = profile_checkpoints.resume(("profile",), emit).get("profile")
+        if profile_output is None:
+            with job_queue.crew_slot():
+                profile_tasks = _run_crew(
+                    urls[0], linkedin_url, personal_writeup, resume_path, semantic_search_resume,
+                    config, emit=profile_checkpoints.wrap(emit), stages=("profile",)
+                )
+            profile_output = profile_tasks["profile"].output.raw_output
+
+        trace = metrics.current_trace()
+
+        def tailor(index, url):
+            with metrics.bind(trace):
+                return tailor_posting(index, url)
+
+        def tailor_posting(index, url):
+            def posting_emit(event, data):
+                if emit:
+                    emit(event, dict(data, posting=index, jobPostingUrl=url))
+
+            posting_emit("posting_started", {})
+            try:
+                checkpoints = _checkpoints(params, url)
+                outputs = checkpoints.resume(_stage_names(params['pipeline_mode'], stages), posting_emit)
+                if not all(stage in outputs for stage in stages):
+                    # Postings share the queue's crew cap with single runs
+                    with job_queue.crew_slot():
+                        tasks = _run_crew(
+                            url, linkedin_url, personal_writeup, resume_path, semantic_search_resume,
+                            config, emit=checkpoints.wrap(posting_emit),
+                            completed=dict(outputs, profile=profile_output),
+                            stages=stages, pipeline=params['pipeline_mode']
+                        )
+                    outputs = {stage: task.output.raw_output for stage, task in tasks.items()}
+                result = {
+                    "status": "success",
+                    "tailoredResume": outputs["resume_strategy"],
+                    "tailoredResumeSections": _resume_sections(outputs["resume_strategy"]),
+                    "researchNotes": outputs["research"],
+                }
+                if "interview_preparation" in outputs:
+                    result["interviewMaterials"] = outputs["interview_preparation"]
+                result = _stored(result)
+            except Exception as e:
+                print(f"Error: {str(e)}")
+                result = {"status": "failed", "message": str(e)}
+            posting_emit("posting_finished", result)
+            return dict(result, jobPostingUrl=url)
+
+        with ThreadPoolExecutor(max_workers=min(BATCH_CONCURRENCY, len(urls))) as pool:
+            results = list(pool.map(tailor, range(len(urls)), urls))
+
+    return _stored({
+        "status": "success",
+        "profile": profile_output,
+        "results": results,
+        "provider": config.llm_provider
+    })
+
+@app.route('/api/match-score', methods=['POST'])
+def match_score():
+    """
+    Score the write-up against one or more postings without running a crew.
+
+    Takes `personalWriteup` and `jobPostingUrl` or `jobPostingUrls`; no API
+    keys are needed. Each result has a 0-100 `score` with the matched and
+    missing skills of the posting. Postings that can't be fetched, or
+    answer with an error status, are reported as failed. Each posting
+    counts against the client's match_score_limiter budget.
+    """
+    data = request.json or {}
+    personal_writeup = data.get('personalWriteup')
+    urls = data.get('jobPostingUrls') or ([data['jobPostingUrl']] if data.get('jobPostingUrl') else [])
+    if (not personal_writeup or not isinstance(urls, list)
+            or not urls or not all(isinstance(url, str) and url for url in urls)):
+        return jsonify({
+            "error": "Missing required fields",
+            "message": "Please provide a personal write-up and at least one job posting URL"
+        }), 400
+    urls = list(dict.fromkeys(urls))
+    if len(urls) > BATCH_MAX_POSTINGS:
+        return jsonify({
+            "error": "Too many job postings",
+            "message": f"Please submit at most {BATCH_MAX_POSTINGS} job postings at once"
+        }), 400
+
+    def fetch(url):
+        try:
+            text, ok = fetch_page(url)
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            return None, str(e)
+        if not ok:
+            return None, "The job posting page answered with an error"
+        return text, None
+
+    try:
+        with match_score_limiter.admit(request.remote_addr, cost=len(urls)):
+            with ThreadPoolExecutor(max_workers=min(BATCH_CONCURRENCY, len(urls))) as pool:
+                pages = list(pool.map(fetch, urls))
+    except AdmissionError as e:
+        return _busy(e)
+
+    fetched = [(url, text) for url, (text, _) in zip(urls, pages) if text is not None]
+    scores = dict(zip(
+        [url for url, _ in fetched],
+        score_postings(personal_writeup, [text for _, text in fetched])
+    ))
+    results = []
+    for url, (_, error) in zip(urls, pages):
+        if url in scores:
+            results.append(dict(scores[url], status="success", jobPostingUrl=url))
+        else:
+            results.append({"status": "failed", "message": error, "jobPostingUrl": url})
+    return jsonify({"status": "success", "results": results}), 200
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    params, error = _parse_request(request.json)
+    if error:
+        return error
+
+    try:
+        job = _submit(run_job_application_crew, params)
+    except AdmissionError as e:
+        return _busy(e)
+
+    return jsonify({"jobId": job.id, "status": job.status}), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Not found", "message": "Unknown job ID"}), 404
+    return jsonify(job.to_dict()), 200
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Not found", "message": "Unknown job ID"}), 404
+    if job.status == "failed":
+        return jsonify({"error": "Server error", "message": job.error}), 500
+    if not job.done:
+        return jsonify({"error": "Not ready", "message": "Job is still running", "status": job.status}), 409
+    if job.result.get('resultId'):
+        return _cached_response(job.result['resultId'], lambda: jsonify(job.result))
+    return jsonify(job.result), 200
+
+def _cached_response(etag, make_response):
+    """
+    A response for content that never changes under `etag`: 304 when the
+    client already has it (in any encoding), else make_response().
+    If-None-Match is compared weakly, so ETags a proxy weakened still match.
+    """
+    matched = next(
+        (tag for tag in etag_variants(etag) if request.if_none_match.contains_weak(tag)), None
+    )
+    if matched is not None:
+        response = Response(status=304)
+        response.set_etag(matched)
+    else:
+        response = make_response()
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = f"private, max-age={RESULT_TTL}, immutable"
+    return response
+
+def _result_or_404(result_id):
+    result = load_result(result_id)
+    if result is None:
+        return None, (jsonify({"error": "Not found", "message": "Unknown or expired result ID"}), 404)
+    return result, None
+
+@app.route('/api/results/<result_id>', methods=['GET'])
+def get_result(result_id):
+    """A finished result by its `resultId`, without running the crew again."""
+    result, error = _result_or_404(result_id)
+    if error:
+        return error
+    return _cached_response(result_id, lambda: jsonify(dict(result, resultId=result_id)))
+
+@app.route('/api/results/<result_id>/postings', methods=['GET'])
+def get_result_postings(result_id):
+    """
+    One page of a batch result's postings, selected with `offset` and
+    `limit` (at most 50, RESULTS_PAGE_SIZE by default).
+    """
+    result, error = _result_or_404(result_id)
+    if error:
+        return error
+    if 'results' not in result:
+        return jsonify({"error": "Not found", "message": "This result is not a batch"}), 404
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = min(50, max(1, int(request.args.get('limit', RESULTS_PAGE_SIZE))))
+    except ValueError:
+        return jsonify({"error": "Invalid page", "message": "offset and limit must be integers"}), 400
+
+    postings = result['results']
+    return _cached_response(f"{result_id}-postings-{offset}-{limit}", lambda: jsonify({
+        "resultId": result_id,
+        "offset": offset,
+        "limit": limit,
+        "total": len(postings),
+        "postings": postings[offset:offset + limit],
+    }))
+
+@app.route('/api/results/<result_id>/<artifact>', methods=['GET'])
+def get_result_artifact(result_id, artifact):
+    """One document of a result as markdown: resume, interview-materials, research or profile."""
+    result, error = _result_or_404(result_id)
+    if error:
+        return error
+    if artifact not in ARTIFACTS:
+        return jsonify({
+            "error": "Unknown artifact",
+            "message": f"artifact must be one of: {', '.join(ARTIFACTS)}"
+        }), 404
+    text = result.get(ARTIFACTS[artifact])
+    if text is None:
+        return jsonify({"error": "Not found", "message": f"This result has no {artifact}"}), 404
+    return _cached_response(
+        f"{result_id}-{artifact}",
+        lambda: Response(text, mimetype='text/markdown')
+    )
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """
+    Stream a job's progress as Server-Sent Events.
+
+    Each task emits `task_started` and `task_finished` (with its output),
+    and the stream ends with `job_succeeded` or `job_failed`. Clients that
+    reconnect with Last-Event-ID only receive the events they missed.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Not found", "message": "Unknown job ID"}), 404
+
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('lastEventId'))
+    start = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+
+    def generate():
+        for item in job.iter_events(start):
+            if item is None:
+                yield ": keep-alive\n\n"
+                continue
+            index, event, data = item
+            yield f"id: {index}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/batch', methods=['POST'])
+def submit_batch():
+    """
+    Queue one profile against many job postings. Progress and per-posting
+    results stream from /api/jobs/<id>/events like any other job.
+    """
+    params, error = _parse_request(request.json, batch=True)
+    if error:
+        return error
+
+    try:
+        job = _submit(run_batch, params, priority="batch")
+    except AdmissionError as e:
+        return _busy(e)
+
+    return jsonify({"jobId": job.id, "status": job.status}), 202
+
+@app.route('/api/generate-resume', methods=['POST'])
+def generate_resume():
+    """
+    Synchronous variant kept for older clients; still runs on the job pool
+    so it counts against the same concurrency limit.
+    """
+    params, error = _parse_request(request.json)
+    if error:
+        return error
+
+    try:
+        job = _submit(run_job_application_crew, params)
+    except AdmissionError as e:
+        return _busy(e)
+
+    job.wait()
+    if job.status == "failed":
+        return jsonify({"error": "Server error", "message": job.error}), 500
+    return jsonify(job.result), 200
+
+def preload_crew():
+    """Import the crew stack and build the shared tools before the first request."""
+    import crew_factory
+    import resume_index  # noqa: F401
+
+    crew_factory.shared_tools()
+
+if PRELOAD_CREW:
+    preload_crew()
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5001))
@@ -0,0 +1,122 @@
+"""
+ASGI entry point serving the same API as app.py.
+
+Under gunicorn every open connection holds a thread for as long as it is
+open, which for /api/generate-resume and the event streams means minutes.
+Here those long-lived endpoints are served from the event loop and wait on
+the job without a thread of their own, so a single worker can hold
+thousands of idle streams; everything else is handed to the Flask app.
+Crew runs still happen on the job pool (see jobs.py).
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 1
+
+Keep to one worker: jobs live in the worker's memory, like under gunicorn.
+"""
+import json
+import os
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+from app import _busy, _parse_request, _submit, app as flask_app, job_queue, run_job_application_crew
+from compression import COMPRESS_MIN_BYTES, best_encoding, compress
+from jobs import AdmissionError
+
+# Threads for the requests handed to the Flask app
+WSGI_THREADS = int(os.environ.get("WSGI_THREADS", 16))
+
+
+def _flask_response(rv):
+    # _parse_request and _busy return (flask response, status[, headers])
+    response, status, headers = rv if len(rv) == 3 else rv + ({},)
+    return Response(
+        response.get_data(), status_code=status, headers=headers, media_type=response.mimetype
+    )
+
+
+def _json_response(request, data):
+    # Compressed like the Flask app's responses
+    body = json.dumps(data).encode("utf-8")
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = best_encoding(request.headers.get("Accept-Encoding"))
+    if encoding is not None and len(body) >= COMPRESS_MIN_BYTES:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(body, headers=headers, media_type="application/json")
+
+
+async def _request_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+async def health_check(request):
+    return JSONResponse({"status": "healthy"})
+
+
+async def stream_job_events(request):
+    """
+    Stream a job's progress as Server-Sent Events, like the Flask route,
+    without holding a thread per connection.
+    """
+    job = job_queue.get(request.path_params["job_id"])
+    if job is None:
+        return JSONResponse({"error": "Not found", "message": "Unknown job ID"}, status_code=404)
+
+    last_event_id = request.headers.get("Last-Event-ID", request.query_params.get("lastEventId"))
+    start = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+
+    async def generate():
+        async for item in job.aiter_events(start):
+            if item is None:
+                yield ": keep-alive\n\n"
+                continue
+            index, event, data = item
+            yield f"id: {index}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def generate_resume(request):
+    """
+    Synchronous variant kept for older clients. The crew runs on the job
+    pool; the request just waits for it on the event loop.
+    """
+    data = await _request_json(request)
+    with flask_app.app_context():
+        params, error = _parse_request(data)
+    if error:
+        return _flask_response(error)
+
+    try:
+        job = _submit(run_job_application_crew, params)
+    except AdmissionError as e:
+        with flask_app.app_context():
+            return _flask_response(_busy(e))
+
+    await job.wait_async()
+    if job.status == "failed":
+        return JSONResponse({"error": "Server error", "message": job.error}, status_code=500)
+    return _json_response(request, job.result)
+
+
+app = Starlette(
+    routes=[
+        Route("/api/health", health_check, methods=["GET"]),
+        Route("/api/jobs/{job_id}/events", stream_job_events, methods=["GET"]),
+        Route("/api/generate-resume", generate_resume, methods=["POST"]),
+        # Short requests go to the Flask app on a small thread pool
+        Mount("/", WSGIMiddleware(flask_app, workers=WSGI_THREADS)),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])],
+)
@@ -0,0 +1,100 @@
+"""
+Cold start of the backend: time from launching the server to the first
+healthy /api/health, and its memory once healthy.
+
+Each mode is started --runs times with an empty DATA_DIR:
+
+- lazy: gunicorn as in Dockerfile.backend; the crew stack is imported by
+  the first crew run
+- preload: PRELOAD_CREW=1 with `gunicorn --preload`, so the crew stack is
+  imported once in the master and shared copy-on-write by the workers
+- asgi: uvicorn serving asgi.py, lazy like the first
+
+Memory is reported as RSS and PSS summed over the master and workers; PSS
+splits shared pages between the processes sharing them, so it shows what
+preloading saves with several workers. Linux only.
+
+    python benchmarks/bench_cold_start.py --runs 5 --workers 1 4
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_connections import free_port, proc_kb, tree_pids, wait_healthy  # noqa: E402
+
+MODES = ("lazy", "preload", "asgi")
+
+
+def server_command(mode, port, workers):
+    if mode == "asgi":
+        return [
+            sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ]
+    command = [
+        sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers), "--threads", "8", "app:app",
+    ]
+    if mode == "preload":
+        command.insert(-1, "--preload")
+    return command
+
+
+def cold_start(mode, workers):
+    """Start one server and return (seconds to healthy, RSS MB, PSS MB)."""
+    port = free_port()
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = dict(os.environ, DATA_DIR=data_dir, PRELOAD_CREW="1" if mode == "preload" else "0")
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            server_command(mode, port, workers), cwd=ROOT, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_healthy(f"http://127.0.0.1:{port}", timeout=120)
+            seconds = time.perf_counter() - started
+            # Workers answer health checks before all of them have booted
+            time.sleep(1)
+            pids = tree_pids(process.pid)
+            rss = proc_kb("status", "VmRSS", pids) / 1024
+            pss = proc_kb("smaps_rollup", "Pss", pids) / 1024
+        finally:
+            process.terminate()
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    return seconds, rss, pss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=MODES + ("all",), default="all")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    modes = MODES if args.mode == "all" else (args.mode,)
+    print(f"{'mode':<8} {'workers':>7} {'healthy p50 s':>13} {'max s':>6} {'RSS MB':>8} {'PSS MB':>8}")
+    for mode in modes:
+        for workers in args.workers:
+            try:
+                results = [cold_start(mode, workers) for _ in range(args.runs)]
+            except Exception as e:
+                print(f"{mode:<8} {workers:>7} failed: {str(e)}")
+                continue
+            seconds = [r[0] for r in results]
+            print(f"{mode:<8} {workers:>7} {statistics.median(seconds):>13.2f} {max(seconds):>6.2f} "
+                  f"{statistics.median(r[1] for r in results):>8.1f} "
+                  f"{statistics.median(r[2] for r in results):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Memory per held connection under gunicorn (app.py) and uvicorn (asgi.py).
+
+For each server and connection count a fresh server process is started
+against benchmarks/stub_services.py, one job is submitted to a stub LLM slow
+enough that the job keeps running, and that many clients open the job's
+event stream (/api/jobs/<id>/events) at once and hold it, the way browsers
+following a run do. Reported per run: how many streams were being served
+(got their first event), the server's RSS before and after, and the
+difference per served stream.
+
+    python benchmarks/bench_connections.py --connections 50 500 2000
+
+gunicorn runs with the threads of Dockerfile.backend unless
+--gunicorn-threads says otherwise; streams beyond its threads wait in the
+accept queue. Linux only, RSS is read from /proc.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_offline import child_env  # noqa: E402
+from stub_services import StubServices  # noqa: E402
+
+SERVERS = ("gunicorn", "uvicorn")
+
+
+def server_command(server, port, gunicorn_threads):
+    if server == "gunicorn":
+        return [
+            sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}",
+            "--workers", "1", "--threads", str(gunicorn_threads), "--backlog", "4096", "app:app",
+        ]
+    return [
+        sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1", "--port", str(port),
+        "--workers", "1", "--backlog", "4096", "--log-level", "warning",
+    ]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def tree_pids(pid):
+    """A process and all its descendants, e.g. gunicorn's master and workers."""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    # The command name may contain spaces, the fields after it don't
+                    parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    pids = {pid}
+    while True:
+        children = {child for child, parent in parents.items() if parent in pids} - pids
+        if not children:
+            return pids
+        pids |= children
+
+
+def proc_kb(path, field, pids):
+    """Sum of a "<field>: <n> kB" line of /proc/<pid>/<path> over pids."""
+    total_kb = 0
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/{path}") as f:
+                for line in f:
+                    if line.startswith(field + ":"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return total_kb
+
+
+def tree_rss_mb(pid):
+    return proc_kb("status", "VmRSS", tree_pids(pid)) / 1024
+
+
+def wait_healthy(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not come up")
+
+
+def submit_job(base_url, stub_url):
+    with open(os.path.join(ROOT, "fake_resume.md")) as f:
+        resume = f.read()
+    body = json.dumps({
+        "llmProvider": "openai",
+        "openaiApiKey": "sk-benchmark",
+        "serperApiKey": "benchmark",
+        "jobPostingUrl": f"{stub_url}/fixtures/job_posting.html",
+        "linkedinUrl": f"{stub_url}/fixtures/profile.html",
+        "personalWriteup": resume,
+    }).encode("utf-8")
+    request = urllib.request.Request(
+        f"{base_url}/api/jobs", data=body, headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())["jobId"]
+
+
+async def hold_streams(port, job_id, connections, settle):
+    """Open `connections` event streams and return (open, served, writers)."""
+
+    async def open_stream():
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            return None, False
+        writer.write(
+            f"GET /api/jobs/{job_id}/events HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+            f"Accept: text/event-stream\r\n\r\n".encode("ascii")
+        )
+        await writer.drain()
+        try:
+            # The stream starts with the job's past events
+            await asyncio.wait_for(reader.readuntil(b"event:"), settle)
+            return writer, True
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, OSError):
+            return writer, False
+
+    results = await asyncio.gather(*(open_stream() for _ in range(connections)))
+    writers = [writer for writer, _ in results if writer is not None]
+    served = sum(1 for _, ok in results if ok)
+    return len(writers), served, writers
+
+
+def measure(server, connections, services, args):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as data_dir:
+        process = subprocess.Popen(
+            server_command(server, port, args.gunicorn_threads),
+            cwd=ROOT, env=child_env(services.base_url, data_dir, 1),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_healthy(base_url)
+            job_id = submit_job(base_url, services.base_url)
+            time.sleep(args.settle)  # Let the job reach its first LLM call
+            before = tree_rss_mb(process.pid)
+
+            async def run():
+                opened, served, writers = await hold_streams(port, job_id, connections, args.settle)
+                await asyncio.sleep(args.settle)
+                after = tree_rss_mb(process.pid)
+                for writer in writers:
+                    writer.close()
+                return opened, served, after
+
+            opened, served, after = asyncio.run(run())
+        finally:
+            process.terminate()
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    return opened, served, before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--server", choices=SERVERS + ("both",), default="both")
+    parser.add_argument("--connections", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--gunicorn-threads", type=int, default=8,
+                        help="threads of the gunicorn worker (Dockerfile.backend uses 8)")
+    parser.add_argument("--settle", type=float, default=5.0,
+                        help="seconds to wait for streams to start and memory to settle")
+    args = parser.parse_args()
+
+    # Every held stream is a file descriptor on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    # The job must still be running while the streams are held
+    services = StubServices(llm_latency=3600).start()
+    servers = SERVERS if args.server == "both" else (args.server,)
+
+    print(f"{'server':<9} {'conns':>6} {'open':>6} {'served':>6} {'RSS before MB':>14} "
+          f"{'RSS after MB':>13} {'KB/served':>10}")
+    for server in servers:
+        for connections in args.connections:
+            try:
+                opened, served, before, after = measure(server, connections, services, args)
+            except Exception as e:
+                print(f"{server:<9} {connections:>6} failed: {str(e)}")
+                continue
+            per_stream = (after - before) * 1024 / served if served else float("nan")
+            print(f"{server:<9} {connections:>6} {opened:>6} {served:>6} {before:>14.1f} "
+                  f"{after:>13.1f} {per_stream:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
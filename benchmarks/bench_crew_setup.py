@@ -0,0 +1,115 @@
+"""
+Per-request crew setup cost: the old inline construction in app.py versus
+crew_factory.build_crew, at several levels of concurrency.
+
+No LLM or network calls are made; only agents, tools, tasks and the crew
+are constructed. Both paths share one prebuilt resume search tool, so the
+embedding work that resume_index.py removes is not part of these numbers.
+
+    python benchmarks/bench_crew_setup.py --requests 200 --concurrency 1 4 16
+"""
+import argparse
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from crewai import Agent, Crew, Task  # noqa: E402
+from crewai_tools import FileReadTool, ScrapeWebsiteTool, SerperDevTool  # noqa: E402
+
+from crew_factory import AGENT_SPECS, TASK_SPECS, build_crew  # noqa: E402
+from resume_index import build_resume_search_tool  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+JOB_POSTING_URL = "https://jobs.lever.co/example/1234"
+PROFILE_URL = "https://www.linkedin.com/in/example"
+
+
+def inline_setup(resume_path, semantic_search_resume, output_dir):
+    """What generate_resume used to build on every request."""
+    tools = {
+        "search": SerperDevTool(),
+        "scrape": ScrapeWebsiteTool(),
+        "read_resume": FileReadTool(file_path=resume_path),
+        "search_resume": semantic_search_resume,
+    }
+    agents = {
+        name: Agent(
+            role=spec["role"],
+            goal=spec["goal"],
+            backstory=spec["backstory"],
+            tools=[tools[tool] for tool in spec["tools"]],
+            verbose=True,
+        )
+        for name, spec in AGENT_SPECS.items()
+    }
+    tasks = []
+    for stage, spec in TASK_SPECS.items():
+        tasks.append(Task(
+            description=spec["description"].format(
+                job_posting_url=JOB_POSTING_URL, profile_url=PROFILE_URL
+            ),
+            expected_output=spec["expected_output"],
+            agent=agents[spec["agent"]],
+            context=list(tasks) or None,
+        ))
+    return Crew(agents=list(agents.values()), tasks=tasks, verbose=True)
+
+
+def factory_setup(resume_path, semantic_search_resume, output_dir):
+    return build_crew(JOB_POSTING_URL, PROFILE_URL, resume_path, semantic_search_resume, output_dir)
+
+
+def measure(setup, requests, concurrency, resume_path, semantic_search_resume, output_dir):
+    def one(_):
+        start = time.perf_counter()
+        setup(resume_path, semantic_search_resume, output_dir)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        timings = sorted(pool.map(one, range(requests)))
+        elapsed = time.perf_counter() - started
+    return {
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p95_ms": timings[math.ceil(len(timings) * 0.95) - 1] * 1000,  # Nearest rank
+        "per_second": requests / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    resume_path = os.path.join(ROOT, "fake_resume.md")
+    with open(resume_path) as f:
+        semantic_search_resume = build_resume_search_tool(f.read())
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        # Warm up imports and the factory's shared tools
+        factory_setup(resume_path, semantic_search_resume, output_dir)
+        inline_setup(resume_path, semantic_search_resume, output_dir)
+
+        print(f"{'setup':<8} {'conc':>4} {'mean ms':>9} {'p95 ms':>9} {'setups/s':>9}")
+        for concurrency in args.concurrency:
+            results = {}
+            for name, setup in (("inline", inline_setup), ("factory", factory_setup)):
+                results[name] = measure(
+                    setup, args.requests, concurrency, resume_path, semantic_search_resume, output_dir
+                )
+                r = results[name]
+                print(f"{name:<8} {concurrency:>4} {r['mean_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['per_second']:>9.1f}")
+            saved = results["inline"]["mean_ms"] - results["factory"]["mean_ms"]
+            print(f"{'saved':<8} {concurrency:>4} {saved:>9.2f} ms per request")
+
+
+if __name__ == "__main__":
+    main()
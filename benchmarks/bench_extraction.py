@@ -0,0 +1,61 @@
+"""
+How much smaller pages get before the LLM sees them: the text the stock
+ScrapeWebsiteTool returned versus extraction.extract_text, per fixture page.
+
+    python benchmarks/bench_extraction.py --repeat 50
+"""
+import argparse
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from extraction import estimate_tokens, extract_text  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# The URL each fixture was taken from, which picks the site extractor
+FIXTURE_URLS = {
+    "job_posting.html": "https://jobs.lever.co/aifund/6c82e23e-d954-4dd8-a734-c0c2c5ee00f1",
+    "greenhouse_posting.html": "https://boards.greenhouse.io/northwindlabs/jobs/4412309",
+    "profile.html": "https://github.com/noah-williams",
+}
+
+
+def scrape_tool_text(html):
+    """The cleanup ScrapeWebsiteTool applies to a page."""
+    text = BeautifulSoup(html, "html.parser").get_text()
+    text = '\n'.join([i for i in text.split('\n') if i.strip() != ''])
+    return ' '.join([i for i in text.split(' ') if i.strip() != ''])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="extractions timed per page")
+    args = parser.parse_args()
+
+    print(f"{'page':<24} {'html KB':>8} {'tool tok':>9} {'extract tok':>12} {'saved':>7} {'ms':>7}")
+    totals = [0, 0]
+    for name, url in FIXTURE_URLS.items():
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            html = f.read()
+        before = estimate_tokens(scrape_tool_text(html))
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            text = extract_text(html, url)
+        ms = (time.perf_counter() - start) / args.repeat * 1000
+
+        after = estimate_tokens(text)
+        totals[0] += before
+        totals[1] += after
+        print(f"{name:<24} {len(html) / 1024:>8.1f} {before:>9} {after:>12} "
+              f"{1 - after / before:>7.0%} {ms:>7.2f}")
+    print(f"{'total':<24} {'':>8} {totals[0]:>9} {totals[1]:>12} {1 - totals[1] / totals[0]:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
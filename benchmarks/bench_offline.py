@@ -0,0 +1,234 @@
+"""
+End-to-end latency, throughput and memory of full crew runs, offline.
+
+Runs go against benchmarks/stub_services.py (a deterministic LLM, Serper and
+the recorded pages in benchmarks/fixtures), with fake_resume.md as the
+resume, so no keys or network are needed and numbers are comparable
+between changes. Two targets are measured:
+
+- app: POST /api/generate-resume on the Flask app, through the job queue
+- crew: the crew exactly as L7_job_application_crew.py builds and kicks it off
+
+Every (target, concurrency) pair runs in a fresh process with an empty
+DATA_DIR, so peak RSS is per run and caches start cold. By default every
+request uses its own posting URL; pass --same-posting to let later
+requests hit the scrape and requirements caches. Each app request has a
+write-up of its own either way, so concurrent requests are never
+coalesced into one job.
+
+    python benchmarks/bench_offline.py --requests 20 --concurrency 1 4 --llm-latency 0.2
+
+crewai counts tokens with tiktoken, which downloads its encodings on first
+use; set TIKTOKEN_CACHE_DIR to a populated cache to run fully offline.
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_services import StubServices  # noqa: E402
+
+TARGETS = ("app", "crew")
+PERSONAL_WRITEUP = (
+    "Noah is an accomplished Software Engineering Leader with 18 years of experience, "
+    "specializing in managing remote and in-office teams, and expert in multiple "
+    "programming languages and frameworks."
+)
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def posting_url(base_url, index, same_posting):
+    url = f"{base_url}/fixtures/job_posting.html"
+    return url if same_posting else f"{url}?req={index}"
+
+
+def app_runner(base_url, same_posting, pipeline):
+    from app import app
+
+    client = app.test_client()
+    with open(os.path.join(ROOT, "fake_resume.md")) as f:
+        resume = f.read()
+
+    def run(index):
+        response = client.post("/api/generate-resume", json={
+            "llmProvider": "openai",
+            "openaiApiKey": "sk-benchmark",
+            "serperApiKey": "benchmark",
+            "jobPostingUrl": posting_url(base_url, index, same_posting),
+            "linkedinUrl": f"{base_url}/fixtures/profile.html",
+            "personalWriteup": f"{resume}\n<!-- request {index} -->\n",
+            "pipelineMode": pipeline,
+        })
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+    return run
+
+
+def crew_runner(base_url, same_posting, pipeline):
+    from crew_factory import RequestConfig, build_crew
+    from resume_index import build_resume_search_tool
+
+    resume_path = os.path.join(ROOT, "fake_resume.md")
+
+    def run(index):
+        # Same steps as the notebook cells in L7_job_application_crew.py
+        config = RequestConfig(
+            llm_provider="openai",
+            model_name="gpt-3.5-turbo",
+            openai_api_key="sk-benchmark",
+            serper_api_key="benchmark",
+        )
+        inputs = {
+            "job_posting_url": posting_url(base_url, index, same_posting),
+            "github_url": f"{base_url}/fixtures/profile.html",
+            "personal_writeup": PERSONAL_WRITEUP,
+        }
+        with open(resume_path) as f:
+            semantic_search_resume = build_resume_search_tool(f.read(), config.openai_api_key)
+        with tempfile.TemporaryDirectory() as output_dir:
+            crew, _ = build_crew(
+                job_posting_url=inputs["job_posting_url"],
+                profile_url=inputs["github_url"],
+                resume_path=resume_path,
+                semantic_search_resume=semantic_search_resume,
+                output_dir=output_dir,
+                config=config,
+                pipeline=pipeline,
+                verbose=False,
+            )
+            crew.kickoff(inputs=inputs)
+
+    return run
+
+
+def run_child(args):
+    """Runs one (target, concurrency) pair and prints its results as JSON."""
+    runner = {"app": app_runner, "crew": crew_runner}[args.child](
+        args.base_url, args.same_posting, args.pipeline
+    )
+
+    for index in range(args.warmup):
+        runner(-1 - index)
+
+    def one(index):
+        start = time.perf_counter()
+        try:
+            runner(index)
+        except Exception as e:
+            print(f"Error: {str(e)}", file=sys.stderr)
+            return None
+        return time.perf_counter() - start
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency[0]) as pool:
+        results = list(pool.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    timings = sorted(t for t in results if t is not None)
+    print(json.dumps({
+        "ok": len(timings),
+        "errors": len(results) - len(timings),
+        "p50_s": statistics.median(timings) if timings else None,
+        "p95_s": timings[math.ceil(len(timings) * 0.95) - 1] if timings else None,  # Nearest rank
+        "per_minute": len(timings) / elapsed * 60,
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+def child_env(base_url, data_dir, concurrency):
+    env = dict(os.environ)
+    env.update({
+        "DATA_DIR": data_dir,
+        "OPENAI_API_BASE": f"{base_url}/v1",
+        "OPENAI_BASE_URL": f"{base_url}/v1",
+        "OPENAI_API_KEY": "sk-benchmark",
+        "SERPER_SEARCH_URL": f"{base_url}/search",
+        "OTEL_SDK_DISABLED": "true",
+    })
+    # Everything is served from one local host, which the per-host limits
+    # for real sites would otherwise throttle
+    env.setdefault("HTTP_HOST_RATE", "1000")
+    env.setdefault("HTTP_HOST_BURST", "1000")
+    env.setdefault("HTTP_MAX_PER_HOST", "64")
+    env.setdefault("JOB_WORKERS", str(concurrency))
+    # Every request uses the same API key, so lift its quota, and keep room
+    # in the queue for all requests in flight
+    env.setdefault("JOB_QUOTA_PER_KEY", "0")
+    env.setdefault("JOB_QUEUE_SIZE", str(max(50, concurrency)))
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", choices=TARGETS + ("both",), default="both")
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs before measuring")
+    parser.add_argument("--llm-latency", type=float, default=0.2,
+                        help="seconds the stub LLM takes per completion")
+    parser.add_argument("--token-latency", type=float, default=0.0,
+                        help="extra seconds the stub LLM takes per completion token")
+    parser.add_argument("--same-posting", action="store_true",
+                        help="use one posting URL for every request")
+    parser.add_argument("--pipeline", choices=("strict", "parallel"), default="strict",
+                        help="task layout to run, see crew_factory.PIPELINES")
+    parser.add_argument("--child", choices=TARGETS, help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return run_child(args)
+
+    services = StubServices(llm_latency=args.llm_latency, token_latency=args.token_latency).start()
+    targets = TARGETS if args.target == "both" else (args.target,)
+
+    print(f"{'target':<6} {'conc':>4} {'ok':>4} {'err':>4} {'p50 s':>8} {'p95 s':>8} {'runs/min':>9} "
+          f"{'peak MB':>8} {'prompt tok/run':>14}")
+    for target in targets:
+        for concurrency in args.concurrency:
+            prompt_tokens = services.prompt_tokens
+            with tempfile.TemporaryDirectory() as data_dir:
+                command = [
+                    sys.executable, os.path.abspath(__file__), "--child", target,
+                    "--base-url", services.base_url, "--requests", str(args.requests),
+                    "--concurrency", str(concurrency), "--warmup", str(args.warmup),
+                    "--pipeline", args.pipeline,
+                ]
+                if args.same_posting:
+                    command.append("--same-posting")
+                child = subprocess.run(
+                    command, env=child_env(services.base_url, data_dir, concurrency),
+                    stdout=subprocess.PIPE, text=True
+                )
+            if child.returncode != 0 or not child.stdout.strip():
+                print(f"{target:<6} {concurrency:>4} failed with exit code {child.returncode}")
+                continue
+            r = json.loads(child.stdout.strip().splitlines()[-1])
+            runs = args.requests + args.warmup
+            prompt_tokens = (services.prompt_tokens - prompt_tokens) / runs
+            p50 = f"{r['p50_s']:.2f}" if r["p50_s"] is not None else "-"
+            p95 = f"{r['p95_s']:.2f}" if r["p95_s"] is not None else "-"
+            print(f"{target:<6} {concurrency:>4} {r['ok']:>4} {r['errors']:>4} {p50:>8} {p95:>8} "
+                  f"{r['per_minute']:>9.1f} {r['peak_rss_mb']:>8.1f} {prompt_tokens:>14.0f}")
+    print(f"stub calls: {services.calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Import-time profile of the backend, from `python -X importtime`.
+
+Imports a module (app by default) in a fresh interpreter and reports the
+total import time, the top-level packages that cost the most and the
+slowest single modules. With --preload the crew stack (crewai, its tools,
+langchain) is imported too, as PRELOAD_CREW=1 does.
+
+    python benchmarks/import_profile.py
+    python benchmarks/import_profile.py --preload --top 25
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile(module, preload):
+    """Return [(module, self_us, cumulative_us, depth)] in import order."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = dict(os.environ, DATA_DIR=data_dir, PRELOAD_CREW="1" if preload else "0")
+        child = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+    if child.returncode != 0:
+        raise RuntimeError(child.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in child.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app", help="module to import, e.g. app or asgi")
+    parser.add_argument("--preload", action="store_true", help="import with PRELOAD_CREW=1")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    try:
+        rows = profile(args.module, args.preload)
+    except RuntimeError as e:
+        sys.exit(f"import {args.module} failed: {str(e)}")
+    total_us = sum(self_us for _, self_us, _, _ in rows)
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split(".")[0]] += self_us
+
+    print(f"import {args.module}{' (PRELOAD_CREW=1)' if args.preload else ''}: "
+          f"{total_us / 1e6:.2f} s, {len(rows)} modules\n")
+    print(f"{'package':<32} {'ms':>8} {'share':>6}")
+    for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<32} {self_us / 1000:>8.1f} {self_us / total_us:>6.1%}")
+
+    print(f"\n{'module':<48} {'self ms':>8} {'cum ms':>8}")
+    for name, self_us, cumulative_us, _ in sorted(rows, key=lambda row: -row[1])[:args.top]:
+        print(f"{name:<48} {self_us / 1000:>8.1f} {cumulative_us / 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Local stand-ins for the services a crew run talks to, so runs can be
+benchmarked offline and deterministically:
+
+- /v1/chat/completions and /v1/embeddings: an OpenAI-compatible LLM. The
+  first reply of an agent reads the URL in its task with the scrape tool
+  (unless the task already has the page content), the next one returns a
+  canned final answer for the task (JSON for the stages with a schema).
+  Requests with `"stream": true` get the reply as Server-Sent Events
+  chunks, as langchain's streaming agents expect.
+- /search: a Serper-compatible search endpoint.
+- /fixtures/<name>: the recorded pages in benchmarks/fixtures.
+
+    python benchmarks/stub_services.py --port 8700 --llm-latency 0.2
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+EMBEDDING_DIMENSIONS = 1536
+
+# Marks the scrape step in the agent's scratchpad, so the next call answers
+SCRAPE_THOUGHT = "Thought: I should read the page first."
+# Tasks that already carry the page content (crew_factory.POSTING_TEXT_NOTE)
+EXTRACTED_MARKER = "has already been extracted"
+
+ANSWERS = {
+    "job requirements": json.dumps({
+        "title": "Full Stack Engineer",
+        "company": "AI Fund",
+        "skills": [
+            "JavaScript/TypeScript, HTML5, CSS", "React or Next.js", "Python or Node.js",
+            "RESTful and GraphQL API design", "PostgreSQL or MySQL, MongoDB or Redis",
+            "Docker, Kubernetes, AWS/GCP/Azure, CI/CD",
+        ],
+        "experience": [
+            "5+ years building web applications across the stack",
+            "Integrating LLMs and ML services into products",
+        ],
+        "qualifications": [
+            "B.Sc. in Computer Science or equivalent experience",
+            "Strong communication with non-technical stakeholders",
+            "Works independently with changing priorities",
+        ],
+        "nice_to_have": ["Early-stage startup experience"],
+    }, indent=2),
+    "profile document": json.dumps({
+        "name": "Noah Williams",
+        "headline": "Engineering leader, 18 years managing remote and in-office teams",
+        "skills": ["Python", "JavaScript", "TypeScript", "AI and data science"],
+        "experience": ["Head of Engineering, DataKernel: led 40 engineers"],
+        "projects": [
+            "featurecache: low-latency online feature store (Python, Redis, Parquet)",
+            "evalkit: regression testing for LLM applications",
+            "react-data-grid-lite: accessible React data grid",
+        ],
+        "education": ["MBA", "B.Sc. in Computer Science"],
+        "interests": ["Data platforms", "team building", "mentoring"],
+        "communication_style": "Clear, structured and pragmatic",
+    }, indent=2),
+    "updated resume": """# Noah Williams
+Engineering Leader | Full Stack | AI Products
+
+## Summary
+Engineering leader with 18 years of experience building web products and data
+platforms, from React front ends to Python services on AWS and GCP, and
+integrating machine learning models into customer-facing applications.
+
+## Experience
+### Head of Engineering, DataKernel
+- Led 40 engineers across remote and in-office teams
+- Built a low-latency feature store and LLM evaluation tooling
+- Introduced CI/CD, infrastructure as code and on-call practices
+
+### Senior Full Stack Engineer, earlier roles
+- Shipped React and Django applications used by millions of users
+- Designed REST and GraphQL APIs backed by PostgreSQL and Redis
+
+## Skills
+Python, TypeScript, JavaScript, React, Next.js, Django, FastAPI, PostgreSQL,
+Redis, Docker, Kubernetes, Terraform, AWS, GCP, LLM integration
+
+## Education
+MBA; B.Sc. in Computer Science""",
+    "questions and talking points": """## Interview Preparation
+
+### Likely questions
+1. Walk us through a product you built end to end.
+2. How have you integrated LLMs into a customer-facing product?
+3. How do you decide what to build first at an early-stage venture?
+4. Describe how you set up CI/CD and monitoring for a new service.
+5. How do you mentor engineers while still shipping yourself?
+
+### Talking points
+- featurecache and evalkit as examples of full stack ownership
+- Leading remote teams through fast-changing priorities
+- Pragmatic use of React, Python and AWS to ship quickly""",
+}
+DEFAULT_ANSWER = "Done. The requested content is complete."
+
+
+def stream_chunks(completion, include_usage=False):
+    """A chat completion as the `data:` events of a streamed response."""
+    content = completion["choices"][0]["message"]["content"]
+    base = {key: completion[key] for key in ("id", "created", "model")}
+    base["object"] = "chat.completion.chunk"
+
+    def chunk(delta, finish_reason=None):
+        return dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": finish_reason}])
+
+    chunks = [chunk({"role": "assistant", "content": ""})]
+    # Word-sized pieces, like a real stream
+    chunks += [chunk({"content": piece}) for piece in re.findall(r"\S*\s*", content) if piece]
+    chunks.append(chunk({}, "stop"))
+    if include_usage:
+        chunks.append(dict(base, choices=[], usage=completion["usage"]))
+    events = [f"data: {json.dumps(c)}\n\n" for c in chunks] + ["data: [DONE]\n\n"]
+    return "".join(events).encode("utf-8")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path.startswith("/fixtures/"):
+            name = os.path.basename(path)
+            fixture = os.path.join(FIXTURES_DIR, name)
+            if name and os.path.isfile(fixture):
+                with open(fixture, "rb") as f:
+                    return self._send(200, f.read(), "text/html; charset=utf-8")
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        body = self._json_body()
+        if path.endswith("/chat/completions"):
+            completion = self.server.chat_completion(body)
+            if body.get("stream"):
+                include_usage = (body.get("stream_options") or {}).get("include_usage")
+                return self._send(
+                    200, stream_chunks(completion, include_usage), "text/event-stream"
+                )
+            return self._send(200, completion)
+        if path.endswith("/embeddings"):
+            return self._send(200, self.server.embeddings(body))
+        if path == "/search":
+            return self._send(200, self.server.search(body))
+        self._send(404, {"error": "not found"})
+
+
+class StubServices(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, llm_latency=0.2, token_latency=0.0):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.llm_latency = llm_latency
+        self.token_latency = token_latency
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.calls = {"chat": 0, "embeddings": 0, "search": 0}
+        self.prompt_tokens = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def _count(self, kind):
+        with self._lock:
+            self.calls[kind] += 1
+
+    def chat_completion(self, body):
+        self._count("chat")
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        urls = re.findall(re.escape(self.base_url) + r"/fixtures/[^\s),]+", prompt)
+        if urls and SCRAPE_THOUGHT not in prompt and EXTRACTED_MARKER not in prompt:
+            content = (
+                f"{SCRAPE_THOUGHT}\nAction: Read website content\n"
+                f"Action Input: {json.dumps({'website_url': urls[0]})}"
+            )
+        else:
+            criteria = prompt.split("expect criteria for your final answer:", 1)[-1][:300]
+            answer = next((text for key, text in ANSWERS.items() if key in criteria), DEFAULT_ANSWER)
+            content = f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+        time.sleep(self.llm_latency + completion_tokens * self.token_latency)
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def embeddings(self, body):
+        self._count("embeddings")
+        texts = body.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        data = []
+        for index, text in enumerate(texts):
+            seed = hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+            rng = random.Random(seed)
+            vector = [rng.uniform(-1, 1) for _ in range(EMBEDDING_DIMENSIONS)]
+            if body.get("encoding_format") == "base64":
+                vector = base64.b64encode(struct.pack(f"{len(vector)}f", *vector)).decode("ascii")
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+        tokens = sum(len(str(text)) // 4 for text in texts)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "stub"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def search(self, body):
+        self._count("search")
+        query = body.get("q", "")
+        return {
+            "searchParameters": {"q": query},
+            "organic": [
+                {
+                    "title": f"{query} - result {rank}",
+                    "link": f"{self.base_url}/fixtures/{name}",
+                    "snippet": f"Recorded page {name} matching {query}.",
+                    "position": rank,
+                }
+                for rank, name in enumerate(sorted(os.listdir(FIXTURES_DIR)), 1)
+            ],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--llm-latency", type=float, default=0.2,
+                        help="seconds added to every chat completion")
+    parser.add_argument("--token-latency", type=float, default=0.0,
+                        help="seconds added per completion token")
+    args = parser.parse_args()
+
+    services = StubServices(args.port, args.llm_latency, args.token_latency)
+    print(f"Stub services listening on {services.base_url}")
+    try:
+        services.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
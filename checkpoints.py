@@ -0,0 +1,98 @@
+"""
+Durable checkpoints of finished stages, so a request that is retried after
+a worker crash or timeout picks up where it stopped.
+
+Every stage output is written to a SQLite file under DATA_DIR as soon as
+the stage finishes, keyed by the client's request ID and the request's
+inputs. A retry with the same request ID loads the finished stages and
+only runs the missing ones. API keys are never part of what is stored.
+"""
+import hashlib
+import json
+import os
+import re
+
+from scrape_cache import normalize_url
+from storage import DiskCache
+
+CHECKPOINT_TTL = int(os.environ.get("CHECKPOINT_TTL", 24 * 3600))
+
+checkpoint_cache = DiskCache("checkpoints", ttl=CHECKPOINT_TTL)
+
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.:-]{8,128}$")
+
+
+def valid_request_id(request_id):
+    return isinstance(request_id, str) and bool(REQUEST_ID_PATTERN.match(request_id))
+
+
+def checkpoint_key(request_id, params, job_posting_url=None):
+    """
+    Key for one run of a request. The inputs are part of it, so reusing a
+    request ID with a different posting, profile, write-up or model starts
+    from scratch instead of resuming someone else's outputs.
+    """
+    run = json.dumps([
+        request_id,
+        normalize_url(job_posting_url) if job_posting_url else None,
+        params['linkedin_url'].strip(),
+        params['personal_writeup'],
+        params['llm_provider'],
+        params.get('model_name') or "default",
+        params.get('pipeline_mode'),
+    ])
+    return hashlib.sha256(run.encode("utf-8")).hexdigest()
+
+
+class StageCheckpoints:
+    """
+    The finished stages of one run. Without a key (no request ID) nothing
+    is loaded or stored.
+    """
+
+    def __init__(self, key=None):
+        self.key = key
+
+    def load(self, stages):
+        """Return a dict of stage name to output for the finished stages."""
+        if not self.key:
+            return {}
+        completed = {}
+        for stage in stages:
+            output = checkpoint_cache.get(f"{self.key}:{stage}")
+            if output is not None:
+                completed[stage] = output
+        return completed
+
+    def resume(self, stages, emit=None):
+        """
+        Load the finished stages and report each one through `emit` as a
+        finished task, the way cached stages are reported.
+        """
+        completed = self.load(stages)
+        if emit:
+            for stage, output in completed.items():
+                emit("task_finished", {"stage": stage, "output": output, "cached": True, "resumed": True})
+        return completed
+
+    def save(self, stage, output):
+        if self.key and output is not None:
+            checkpoint_cache.set(f"{self.key}:{stage}", output)
+
+    def wrap(self, emit):
+        """
+        Return an emit function that checkpoints every finished stage before
+        passing the event on to `emit`. Stages taken from a cache are
+        checkpointed too, since the cache may have dropped them by the time
+        the request is retried; only stages resumed from here are skipped.
+        """
+        def checkpointing_emit(event, data):
+            if event == "task_finished" and not data.get("resumed"):
+                try:
+                    self.save(data["stage"], data.get("output"))
+                except Exception as e:
+                    print(f"Skipping checkpoint: {str(e)}")
+            if emit:
+                emit(event, data)
+
+        return checkpointing_emit
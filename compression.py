@@ -0,0 +1,64 @@
+"""
+gzip and brotli compression of API responses.
+
+Resumes, interview materials and batch results are large, repetitive
+markdown and JSON, so they shrink several times over. Brotli is used when
+the client accepts it, gzip otherwise.
+"""
+import gzip
+import os
+
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # In requirements.txt; without it responses are only gzipped
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", 1024))
+
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+COMPRESSIBLE_TYPES = ("application/json", "text/markdown", "text/plain")
+
+
+def best_encoding(accept_encoding):
+    """The encoding to use for an Accept-Encoding header, or None."""
+    return parse_accept_header(accept_encoding or "").best_match(ENCODINGS)
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        # Quality 5 compresses about as fast as gzip and noticeably smaller
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def etag_variants(etag):
+    """The ETags a client may hold for a response, one per encoding."""
+    return [etag] + [f"{etag}-{encoding}" for encoding in ("br", "gzip")]
+
+
+def compress_response(response, accept_encoding):
+    """
+    Compress a buffered Flask response in place if the client accepts it.
+
+    Streams (such as job events), error responses and small bodies are
+    left alone. A strong ETag gets the encoding appended, since the bytes
+    differ per encoding.
+    """
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = best_encoding(accept_encoding)
+    data = response.get_data()
+    if encoding is None or len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
@@ -0,0 +1,288 @@
+"""
+Agent and task definitions for the job application crew.
+
+Everything that does not depend on the request (roles, goals, backstories
+and task prompts in crew_specs, the scrape tool, and the HTTP connection
+pool of OpenAI models in llm_router) is defined or built once per process.
+build_crew only creates what has to be per request: the search tool
+(it carries the request's Serper key), the resume tools, the agents and
+their chat models (crewai keeps per-run executor state and callbacks on
+them) and the tasks.
+
+API keys and the model travel in a RequestConfig rather than os.environ,
+so crews for different users can run side by side in one process. Each
+agent gets a model of its tier from llm_router.
+"""
+import functools
+import json
+import os
+from typing import Any, ClassVar, Optional
+
+from crewai import Agent, Task, Crew
+from crewai.tasks.task_output import TaskOutput
+from crewai_tools import FileReadTool, ScrapeWebsiteTool, SerperDevTool
+
+import metrics
+from crew_specs import (  # noqa: F401 (re-exported)
+    AGENT_SPECS, ALL_STAGES, DEFAULT_PIPELINE, MATCH_HINT_NOTE, PARALLEL_TASK_SPECS, PIPELINES,
+    POSTING_TEXT_NOTE, RETAILOR_NOTE, TASK_SPECS
+)
+from http_client import http_client
+from llm_router import MODEL_TIERS, build_llm
+from scrape_cache import fetch_page_text
+
+# Overridable so benchmarks can point searches at a local stub
+SERPER_SEARCH_URL = os.environ.get("SERPER_SEARCH_URL", "https://google.serper.dev/search")
+
+
+class RequestConfig:
+    """
+    Credentials and model for one request. Nothing in here is written to
+    the process environment.
+
+    Without a `model_name` every agent gets the model of its tier.
+    """
+
+    def __init__(self, llm_provider="openai", model_name=None, openai_api_key=None,
+                 anthropic_api_key=None, serper_api_key=None):
+        self.llm_provider = llm_provider
+        self.model_name = model_name
+        self.openai_api_key = openai_api_key
+        self.anthropic_api_key = anthropic_api_key
+        self.serper_api_key = serper_api_key
+
+    def api_key(self, provider):
+        return {"openai": self.openai_api_key, "anthropic": self.anthropic_api_key}.get(provider)
+
+    def model_for(self, tier, provider=None):
+        provider = provider or self.llm_provider
+        if self.model_name and provider == self.llm_provider:
+            return self.model_name
+        return MODEL_TIERS[provider][tier]
+
+    def make_llm(self, tier="strong"):
+        """
+        A fresh chat model for one agent; crewai attaches per-agent callbacks
+        to it. Other providers whose key was given are used as fallbacks.
+        """
+        providers = [self.llm_provider] + [
+            provider for provider in MODEL_TIERS
+            if provider != self.llm_provider and self.api_key(provider)
+        ]
+        return build_llm([
+            (provider, self.model_for(tier, provider), self.api_key(provider))
+            for provider in providers
+        ])
+
+
+class SerperSearchTool(SerperDevTool):
+    """
+    SerperDevTool that uses its own API key instead of SERPER_API_KEY and
+    goes through the shared, rate-limited HTTP client.
+    """
+    api_key: Optional[str] = None
+    search_url: str = SERPER_SEARCH_URL
+
+    def _run(
+        self,
+        search_query: str,
+        **kwargs: Any,
+    ) -> Any:
+        payload = json.dumps({"q": search_query})
+        headers = {
+            'X-API-KEY': self.api_key or os.environ['SERPER_API_KEY'],
+            'content-type': 'application/json'
+        }
+        with metrics.tool_span("search"):
+            response = http_client.post(self.search_url, headers=headers, data=payload)
+        results = response.json()
+        if 'organic' not in results:
+            return results
+
+        entries = []
+        for result in results['organic']:
+            try:
+                entries.append('\n'.join([
+                    f"Title: {result['title']}",
+                    f"Link: {result['link']}",
+                    f"Snippet: {result['snippet']}",
+                    "---"
+                ]))
+            except KeyError:
+                continue
+        content = '\n'.join(entries)
+        return f"\nSearch results: {content}\n"
+
+
+class CachedScrapeWebsiteTool(ScrapeWebsiteTool):
+    """ScrapeWebsiteTool that serves repeated URLs from the shared scrape cache."""
+
+    def _run(
+        self,
+        **kwargs: Any,
+    ) -> Any:
+        website_url = kwargs.get('website_url', self.website_url)
+        with metrics.tool_span("scrape"):
+            return fetch_page_text(website_url, headers=self.headers, cookies=self.cookies)
+
+
+class TracedFileReadTool(metrics.TracedTool, FileReadTool):
+    metric_name: ClassVar[str] = "file_read"
+
+
+class StageTask(Task):
+    """
+    Task that reports through `on_event` when it starts and finishes, so
+    clients can follow a run stage by stage instead of waiting for the end.
+    Its run is timed under its stage name in `trace`.
+
+    With an `output_schema` (see schemas.py) the answer is validated and
+    later tasks read its compact rendering; an answer that does not match
+    is kept as it is.
+    """
+    stage: str = ""
+    on_event: Optional[Any] = None
+    trace: Optional[Any] = None
+    output_schema: Optional[Any] = None
+
+    def _execute(self, agent, task, context, tools):
+        self._emit("task_started", {"stage": self.stage})
+        try:
+            # Async tasks run on their own thread, so bind the trace here
+            with metrics.stage_span(self.trace, self.stage):
+                result = super()._execute(agent, task, context, tools)
+        except Exception as e:
+            self._emit("task_failed", {"stage": self.stage, "message": str(e)})
+            raise
+        if self.output_schema:
+            result = self._structure(result)
+        self._emit("task_finished", {"stage": self.stage, "output": self.output.raw_output})
+        return result
+
+    def _structure(self, result):
+        try:
+            structured = self.output_schema.parse(self.output.raw_output)
+        except ValueError as e:
+            print(f"Keeping unstructured {self.stage} output: {str(e)}")
+            metrics.stage_output_invalid.inc(self.stage)
+            return result
+        self.output = TaskOutput(
+            description=self.output.description,
+            exported_output=structured,
+            raw_output=structured.to_context()
+        )
+        return self.output.raw_output
+
+    def _emit(self, event, data):
+        if self.on_event:
+            self.on_event(event, data)
+
+
+@functools.lru_cache(maxsize=None)
+def shared_tools():
+    """Tools that hold no credentials or per-request state, built once."""
+    return {
+        "scrape": CachedScrapeWebsiteTool(),
+    }
+
+
+def build_crew(job_posting_url, profile_url, resume_path, semantic_search_resume, output_dir=None,
+               config=None, emit=None, completed=None, stages=ALL_STAGES, pipeline="strict",
+               posting_text=None, notes=None, verbose=True):
+    """
+    Create the agents, tasks and crew for one request.
+
+    Without a `config` the agents fall back to crewai's defaults, which read
+    OPENAI_API_KEY, OPENAI_MODEL_NAME and SERPER_API_KEY from the environment.
+
+    `completed` maps stage names to outputs that are already known, e.g.
+    cached job requirements. Those tasks are created as finished and left
+    out of the crew; later tasks read them as context like any other
+    finished task. Only the stages listed in `stages` are run.
+
+    `pipeline` picks the task layout from PIPELINES; both produce the same
+    stage outputs. `posting_text`, the extracted posting, is handed to the
+    research task so the researcher does not have to scrape the raw page.
+    `notes` maps stage names to extra instructions for that task.
+
+    Stage outputs stay in memory on the returned tasks; they are only
+    written to files when an `output_dir` is given.
+
+    Returns the crew and a dict of stage name to task.
+    """
+    completed = completed or {}
+    notes = dict(notes or {})
+    if posting_text:
+        notes["research"] = POSTING_TEXT_NOTE.format(posting_text=posting_text) + notes.get("research", "")
+    specs = PIPELINES[pipeline]
+    to_run = [
+        stage for stage, spec in specs.items()
+        if spec.get("part_of", stage) in stages and stage not in completed
+    ]
+    if not to_run:
+        raise ValueError("Nothing left to run")
+
+    tools = dict(shared_tools())
+    tools["search"] = SerperSearchTool(api_key=config.serper_api_key if config else None)
+    tools["read_resume"] = TracedFileReadTool(file_path=resume_path)
+    tools["search_resume"] = semantic_search_resume
+
+    agents = {}
+    for name in dict.fromkeys(specs[stage]["agent"] for stage in to_run):
+        spec = AGENT_SPECS[name]
+        llm = {"llm": config.make_llm(spec["tier"])} if config else {}
+        agents[name] = Agent(
+            role=spec["role"],
+            goal=spec["goal"],
+            backstory=spec["backstory"],
+            tools=[tools[tool] for tool in spec["tools"]],
+            verbose=verbose,
+            **llm
+        )
+
+    tasks = {}
+    for stage, spec in specs.items():
+        if stage not in completed and stage not in to_run:
+            continue
+        kwargs = {}
+        context = [tasks[dependency] for dependency in spec.get("context", ()) if dependency in tasks]
+        if context:
+            kwargs["context"] = context
+        description = spec["description"].format(
+            job_posting_url=job_posting_url, profile_url=profile_url
+        )
+        if stage in notes:
+            # crewai formats descriptions with the kickoff inputs, so escape braces
+            description += notes[stage].replace("{", "{{").replace("}", "}}")
+        expected_output = spec["expected_output"]
+        if spec.get("schema"):
+            kwargs["output_schema"] = spec["schema"]
+            if hasattr(spec["schema"], "format_instructions"):
+                expected_output += spec["schema"].format_instructions().replace("{", "{{").replace("}", "}}")
+        if output_dir and spec.get("output_file"):
+            kwargs["output_file"] = os.path.join(output_dir, spec["output_file"])
+        if stage in completed:
+            kwargs["output"] = TaskOutput(
+                description=f"Completed {stage} stage",
+                exported_output=completed[stage],
+                raw_output=completed[stage]
+            )
+        else:
+            # crewai returns without waiting for a trailing async task
+            kwargs["async_execution"] = spec.get("async_execution", False) and stage != to_run[-1]
+        tasks[stage] = StageTask(
+            stage=stage,
+            on_event=emit,
+            trace=metrics.current_trace(),
+            description=description,
+            expected_output=expected_output,
+            agent=agents.get(spec["agent"]),
+            **kwargs
+        )
+
+    crew = Crew(
+        agents=list(agents.values()),
+        tasks=[tasks[stage] for stage in to_run],
+        verbose=verbose
+    )
+    return crew, tasks
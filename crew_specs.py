@@ -0,0 +1,209 @@
+"""
+Agent roles, task prompts and pipeline layouts of the job application
+crew.
+
+Plain data with no crewai imports, so the API can validate requests and
+list stages without loading the crew stack; crew_factory builds agents
+and tasks from these.
+"""
+import os
+
+from schemas import CandidateProfile, JobRequirements, TailoredResume
+
+# Model of each tier ("tier" of the agents below) per LLM provider
+MODEL_TIERS = {
+    "openai": {
+        "fast": os.environ.get("OPENAI_FAST_MODEL", "gpt-3.5-turbo"),
+        "strong": os.environ.get("OPENAI_STRONG_MODEL", "gpt-4-turbo"),
+    },
+    "anthropic": {
+        "fast": os.environ.get("ANTHROPIC_FAST_MODEL", "claude-3-haiku-20240307"),
+        "strong": os.environ.get("ANTHROPIC_STRONG_MODEL", "claude-3-opus-20240229"),
+    },
+}
+
+AGENT_SPECS = {
+    "researcher": {
+        "role": "Tech Job Researcher",
+        "goal": "Make sure to do amazing analysis on job posting to help job applicants",
+        "tools": ("scrape", "search"),
+        "tier": "fast",
+        "backstory": (
+            "As a Job Researcher, your prowess in navigating and extracting critical "
+            "information from job postings is unmatched. Your skills help pinpoint the necessary "
+            "qualifications and skills sought by employers, forming the foundation for "
+            "effective application tailoring."
+        ),
+    },
+    "profiler": {
+        "role": "Personal Profiler for Engineers",
+        "goal": "Do increditble research on job applicants to help them stand out in the job market",
+        "tools": ("scrape", "search", "read_resume", "search_resume"),
+        "tier": "fast",
+        "backstory": (
+            "Equipped with analytical prowess, you dissect and synthesize information "
+            "from diverse sources to craft comprehensive personal and professional profiles, "
+            "laying the groundwork for personalized resume enhancements."
+        ),
+    },
+    "resume_strategist": {
+        "role": "Resume Strategist for Engineers",
+        "goal": "Find all the best ways to make a resume stand out in the job market.",
+        "tools": ("scrape", "search", "read_resume", "search_resume"),
+        "tier": "strong",
+        "backstory": (
+            "With a strategic mind and an eye for detail, you excel at refining resumes "
+            "to highlight the most relevant skills and experiences, ensuring they "
+            "resonate perfectly with the job's requirements."
+        ),
+    },
+    "interview_preparer": {
+        "role": "Engineering Interview Preparer",
+        "goal": "Create interview questions and talking points based on the resume and job requirements",
+        "tools": ("scrape", "search", "read_resume", "search_resume"),
+        "tier": "strong",
+        "backstory": (
+            "Your role is crucial in anticipating the dynamics of interviews. "
+            "With your ability to formulate key questions and talking points, "
+            "you prepare candidates for success, ensuring they can confidently "
+            "address all aspects of the job they are applying for."
+        ),
+    },
+}
+
+TASK_SPECS = {
+    "research": {
+        "agent": "researcher",
+        "async_execution": True,
+        "schema": JobRequirements,
+        "description": (
+            "Analyze the job posting URL provided ({job_posting_url}) "
+            "to extract key skills, experiences, and qualifications required. "
+            "Use the tools to gather content and identify and categorize the requirements."
+        ),
+        "expected_output": (
+            "A structured list of job requirements, including necessary skills, "
+            "qualifications, and experiences."
+        ),
+    },
+    "profile": {
+        "agent": "profiler",
+        "async_execution": True,
+        "schema": CandidateProfile,
+        "description": (
+            "Compile a detailed personal and professional profile using the "
+            "LinkedIn profile ({profile_url}), and personal write-up. "
+            "Utilize tools to extract and synthesize information from these sources."
+        ),
+        "expected_output": (
+            "A comprehensive profile document that includes skills, project experiences, "
+            "contributions, interests, and communication style."
+        ),
+    },
+    "resume_strategy": {
+        "agent": "resume_strategist",
+        "context": ("research", "profile"),
+        "schema": TailoredResume,
+        "output_file": "tailored_resume.md",
+        "description": (
+            "Using the profile and job requirements obtained from previous tasks, "
+            "tailor the resume to highlight the most relevant areas. Employ tools "
+            "to adjust and enhance the resume content. Make sure this is the best "
+            "resume even but don't make up any information. Update every section, "
+            "including the initial summary, work experience, skills, and education. "
+            "All to better reflect the candidates abilities and how it matches the job posting."
+        ),
+        "expected_output": (
+            "An updated resume that effectively highlights the candidate's "
+            "qualifications and experiences relevant to the job."
+        ),
+    },
+    "interview_preparation": {
+        "agent": "interview_preparer",
+        "context": ("research", "profile", "resume_strategy"),
+        "output_file": "interview_materials.md",
+        "description": (
+            "Create a set of potential interview questions and talking points "
+            "based on the tailored resume and job requirements. Utilize tools to "
+            "generate relevant questions and discussion points. Make sure to use "
+            "these question and talking points to help the candidate highlight the "
+            "main points of the resume and how it matches the job posting."
+        ),
+        "expected_output": (
+            "A document containing key questions and talking points that the "
+            "candidate should prepare for the initial interview."
+        ),
+    },
+}
+
+ALL_STAGES = tuple(TASK_SPECS)
+
+# In the parallel pipeline interview questions are drafted from the research
+# and profile while the resume is tailored, then reconciled with the tailored
+# resume, so only the short reconciliation waits for resume_strategy.
+# "part_of" runs a helper task whenever the named stage is requested.
+PARALLEL_TASK_SPECS = {
+    "research": TASK_SPECS["research"],
+    "profile": TASK_SPECS["profile"],
+    "interview_draft": {
+        "agent": "interview_preparer",
+        "async_execution": True,
+        "part_of": "interview_preparation",
+        "context": ("research", "profile"),
+        "description": (
+            "Draft a set of potential interview questions and talking points "
+            "based on the job requirements and the candidate's profile. Utilize "
+            "tools to generate relevant questions and discussion points. Make sure "
+            "these help the candidate show how their experience matches the job posting."
+        ),
+        "expected_output": (
+            "A draft document containing key questions and talking points that the "
+            "candidate should prepare for the initial interview."
+        ),
+    },
+    "resume_strategy": TASK_SPECS["resume_strategy"],
+    "interview_preparation": {
+        "agent": "interview_preparer",
+        "context": ("interview_draft", "resume_strategy"),
+        "output_file": "interview_materials.md",
+        "description": (
+            "Reconcile the draft interview questions and talking points with the "
+            "tailored resume. Keep what still applies, reword points so they match "
+            "how the resume presents the candidate's experience, and add questions "
+            "for anything the resume now highlights that the draft does not cover. "
+            "Don't make up any information."
+        ),
+        "expected_output": TASK_SPECS["interview_preparation"]["expected_output"],
+    },
+}
+
+PIPELINES = {
+    "strict": TASK_SPECS,
+    "parallel": PARALLEL_TASK_SPECS,
+}
+DEFAULT_PIPELINE = os.environ.get("PIPELINE_MODE", "strict")
+
+# Added to the research task when the posting was extracted before the run
+POSTING_TEXT_NOTE = (
+    "\n\nThe content of the job posting has already been extracted:\n\n"
+    "{posting_text}\n\n"
+    "Work from this content and only use the tools for details it is missing."
+)
+
+# Added to resume_strategy with the local match score (match_score.py)
+MATCH_HINT_NOTE = (
+    "\n\nA keyword comparison of the posting and the write-up found these skills "
+    "in both: {matched}. The posting also asks for: {missing}. Bring the matching "
+    "skills forward, and only mention the others where the write-up supports them."
+)
+
+# Added to resume_strategy when only some sections of the write-up changed
+RETAILOR_NOTE = (
+    "\n\nThe candidate already has a tailored resume for this job and has since "
+    "edited these sections of their write-up: {sections}. Only rewrite the matching "
+    "sections of the tailored resume, using the updated write-up sections below. "
+    "Return just the rewritten sections, each starting with its markdown heading, "
+    "and nothing else.\n\n"
+    "Updated write-up sections:\n\n{writeup_sections}\n\n"
+    "Current tailored resume sections:\n\n{resume_sections}"
+)
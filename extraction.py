@@ -0,0 +1,217 @@
+"""
+Deterministic extraction of the readable content of a scraped page.
+
+Job boards wrap a few hundred words of posting in navigation, cookie
+banners, apply forms, footers and scripts. Everything the agents read goes
+into the prompt, so pages are reduced to their main content before any LLM
+sees them: known ATS hosts (Lever, Greenhouse) have their own extractors,
+other pages go through a main-content heuristic. Repeated blocks are
+dropped and the result is cut to a token budget.
+"""
+import math
+import os
+import re
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup, NavigableString
+
+EXTRACT_TOKEN_BUDGET = int(os.environ.get("EXTRACT_TOKEN_BUDGET", 3000))
+
+# Bumped whenever the output changes, so cached pages are extracted again
+EXTRACTOR_VERSION = 1
+
+# Extracted text shorter than this means the page was not understood
+# (e.g. rendered by JavaScript), so the whole page text is used instead
+MIN_CONTENT_CHARS = 200
+
+# Share of the page's text the main content element has to contain
+MAIN_CONTENT_SHARE = 0.8
+
+NOISE_TAGS = (
+    "script", "style", "noscript", "template", "svg", "iframe", "form",
+    "button", "input", "select", "textarea", "nav", "aside",
+)
+NOISE_ROLES = {"navigation", "banner", "contentinfo", "dialog", "search", "complementary"}
+NOISE_PATTERN = re.compile(
+    r"cookie|consent|breadcrumb|share|social|newsletter|subscribe|related|sidebar|"
+    r"footer|navbar|menu|modal|popup|promo|advert",
+    re.I,
+)
+BLOCK_TAGS = {
+    "address", "article", "blockquote", "dd", "div", "dl", "dt", "figcaption",
+    "figure", "h1", "h2", "h3", "h4", "h5", "h6", "header", "footer", "hr", "li",
+    "main", "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul",
+}
+HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+CONTENT_TAGS = ("p", "li", "pre", "td", "dd", "h1", "h2", "h3", "h4")
+
+# Per host: elements holding the posting, in page order, and elements
+# inside them to leave out
+SITE_EXTRACTORS = {
+    "lever.co": {
+        "keep": (".posting-page .section",),
+        "drop": (".postings-btn-wrapper", ".last-section-apply", ".postings-btn"),
+    },
+    "greenhouse.io": {
+        "keep": ("#header", "#content", ".job__title", ".job__location", ".job__description"),
+        "drop": ("#application", "#apply_button", ".application--form", ".back-to-jobs"),
+    },
+}
+
+
+def estimate_tokens(text):
+    """Rough token count for English text, about four characters per token."""
+    return math.ceil(len(text) / 4)
+
+
+def _site_extractor(url):
+    host = (urlsplit(url).hostname or "") if url else ""
+    for domain, extractor in SITE_EXTRACTORS.items():
+        if host == domain or host.endswith("." + domain):
+            return extractor
+    return None
+
+
+def _remove_noise(soup):
+    noise = list(soup.find_all(NOISE_TAGS))
+    for tag in soup.find_all(True):
+        if tag.name in ("html", "body"):
+            continue
+        if tag.get("role") in NOISE_ROLES:
+            noise.append(tag)
+            continue
+        names = " ".join(tag.get("class") or []) + " " + (tag.get("id") or "")
+        if NOISE_PATTERN.search(names):
+            noise.append(tag)
+        elif tag.name in ("header", "footer") and not tag.find_parent(("article", "main")):
+            noise.append(tag)
+    for tag in noise:
+        if not tag.decomposed:
+            tag.decompose()
+
+
+def _main_content(soup):
+    """
+    The element holding the page's main content: an explicit <main> or
+    <article> when there is one, otherwise the smallest element that holds
+    most of the page's paragraph text, links not counted.
+    """
+    for selector in ("main", "article", "[role=main]"):
+        found = soup.select(selector)
+        if len(found) == 1 and len(found[0].get_text(" ", strip=True)) >= MIN_CONTENT_CHARS:
+            return found[0]
+
+    totals = {}
+    for block in soup.find_all(CONTENT_TAGS):
+        if block.find(CONTENT_TAGS):
+            continue  # Counted through its innermost blocks
+        text = block.get_text(" ", strip=True)
+        links = sum(len(a.get_text(" ", strip=True)) for a in block.find_all("a"))
+        score = len(text) - 2 * links
+        if len(text) < 25 or score <= 0:
+            continue
+        for depth, parent in enumerate(reversed(list(block.parents))):
+            total, _, _ = totals.get(id(parent), (0, depth, parent))
+            totals[id(parent)] = (total + score, depth, parent)
+    if not totals:
+        return soup.body or soup
+
+    page_total = max(total for total, _, _ in totals.values())
+    candidates = [entry for entry in totals.values() if entry[0] >= MAIN_CONTENT_SHARE * page_total]
+    return max(candidates, key=lambda entry: entry[1])[2]
+
+
+def _lines(root):
+    """Text of `root` with one line per block, headings and list items marked."""
+    lines = []
+    current = []
+
+    def flush():
+        text = " ".join("".join(current).split())
+        current.clear()
+        if text and text not in ("-", "##"):
+            lines.append(text)
+
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, NavigableString):
+                # Comments, doctypes and the like are NavigableString subclasses
+                if type(child) is NavigableString:
+                    current.append(str(child))
+            elif child.name == "br":
+                flush()
+            elif child.name in BLOCK_TAGS:
+                flush()
+                if child.name in HEADINGS:
+                    current.append("## ")
+                elif child.name == "li":
+                    current.append("- ")
+                walk(child)
+                flush()
+            else:
+                walk(child)
+
+    walk(root)
+    flush()
+    return lines
+
+
+def _dedupe(lines):
+    seen = set()
+    unique = []
+    for line in lines:
+        key = line.lower().lstrip("#- ")
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(line)
+    return unique
+
+
+def _apply_budget(lines, token_budget):
+    if not token_budget:
+        return lines
+    kept = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > token_budget:
+            kept.append("[...]")
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def extract_text(html, url=None, token_budget=EXTRACT_TOKEN_BUDGET):
+    """
+    Return the main content of an HTML page as compact text.
+
+    `url` selects a site-specific extractor when the page comes from a known
+    ATS host. The result is at most about `token_budget` tokens; pass 0 for
+    no limit.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.title.get_text(" ", strip=True) if soup.title else ""
+    extractor = _site_extractor(url)
+
+    lines = []
+    if extractor:
+        for selector in extractor["drop"]:
+            for tag in soup.select(selector):
+                tag.decompose()
+        for selector in extractor["keep"]:
+            for tag in soup.select(selector):
+                lines.extend(_lines(tag))
+
+    if sum(len(line) for line in lines) < MIN_CONTENT_CHARS:
+        _remove_noise(soup)
+        lines = _lines(_main_content(soup))
+        if title and not any(title.lower() in line.lower() for line in lines[:3]):
+            lines.insert(0, f"# {title}")
+
+    if sum(len(line) for line in lines) < MIN_CONTENT_CHARS:
+        body = soup.body or soup
+        lines = [line for line in _lines(body) if line]
+
+    return "\n".join(_apply_budget(_dedupe(lines), token_budget))
@@ -5,13 +5,54 @@ import axios from 'axios';
 import Header from '@/components/Header';
 import InputForm, { FormData } from '@/components/InputForm';
 import OutputDisplay from '@/components/OutputDisplay';
-import LoadingState from '@/components/LoadingState';
+import LoadingState, { StageProgress } from '@/components/LoadingState';
 import RobotAssistant from '@/components/RobotAssistant';
 import ThemeToggle from '@/components/ThemeToggle';
 
+type JobResult = {
+  tailoredResume: string;
+  interviewMaterials: string;
+  provider: 'openai' | 'anthropic';
+};
+
+// Follow a job's Server-Sent Events until it succeeds or fails
+const streamJob = (
+  jobId: string,
+  onStage: (stage: string, progress: StageProgress) => void
+) =>
+  new Promise<JobResult>((resolve, reject) => {
+    const source = new EventSource(`${process.env.BACKEND_URL}/api/jobs/${jobId}/events`);
+    
+    source.addEventListener('task_started', (event) => {
+      const { stage } = JSON.parse((event as MessageEvent).data);
+      onStage(stage, { status: 'running' });
+    });
+    source.addEventListener('task_finished', (event) => {
+      const { stage, output } = JSON.parse((event as MessageEvent).data);
+      onStage(stage, { status: 'done', output });
+    });
+    source.addEventListener('job_succeeded', (event) => {
+      source.close();
+      resolve(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('job_failed', (event) => {
+      source.close();
+      reject(new Error(JSON.parse((event as MessageEvent).data).message));
+    });
+    // The browser retries dropped connections on its own; it only gives up
+    // (CLOSED) when the stream can't be opened, e.g. the job is gone
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        source.close();
+        reject(new Error('Lost track of the job. Please submit it again.'));
+      }
+    };
+  });
+
 export default function Home() {
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [progress, setProgress] = useState<Record<string, StageProgress>>({});
   const [results, setResults] = useState<{
     tailoredResume: string;
     interviewMaterials: string;
@@ -21,6 +62,7 @@ export default function Home() {
   const handleSubmit = async (data: FormData) => {
     setIsLoading(true);
     setError(null);
+    setProgress({});
     
     try {
       // Create the payload with only the required API key based on provider selection
@@ -39,20 +81,26 @@ export default function Home() {
         Object.assign(payload, { anthropicApiKey: data.anthropicApiKey });
       }
       
-      const response = await axios.post(
-        `${process.env.BACKEND_URL}/api/generate-resume`,
+      // Submit the job, then follow its progress until the crew has finished
+      const submitted = await axios.post(
+        `${process.env.BACKEND_URL}/api/jobs`,
         payload
       );
       
+      const result = await streamJob(submitted.data.jobId, (stage, stageProgress) =>
+        setProgress((current) => ({ ...current, [stage]: stageProgress }))
+      );
+      
       setResults({
-        tailoredResume: response.data.tailoredResume,
-        interviewMaterials: response.data.interviewMaterials,
-        provider: response.data.provider as 'openai' | 'anthropic'
+        tailoredResume: result.tailoredResume,
+        interviewMaterials: result.interviewMaterials,
+        provider: result.provider
       });
     } catch (err: any) {
       console.error('Error generating resume:', err);
       setError(
         err.response?.data?.message || 
+        err.message || 
         'An error occurred while generating your resume. Please try again.'
       );
     } finally {
@@ -70,7 +118,7 @@ export default function Home() {
         <InputForm onSubmit={handleSubmit} isLoading={isLoading} />
       )}
       
-      {isLoading && <LoadingState />}
+      {isLoading && <LoadingState progress={progress} />}
       
       {error && !isLoading && (
         <div className="glass-effect max-w-4xl mx-auto p-8 mt-10 text-center">
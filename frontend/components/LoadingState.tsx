@@ -1,7 +1,28 @@
 import React from 'react';
 import { motion } from 'framer-motion';
 
-const LoadingState: React.FC = () => {
+export interface StageProgress {
+  status: 'running' | 'done';
+  output?: string;
+}
+
+interface LoadingStateProps {
+  progress?: Record<string, StageProgress>;
+}
+
+const STAGES = [
+  { key: 'research', label: 'Analyzing job requirements...' },
+  { key: 'profile', label: 'Creating professional profile...' },
+  { key: 'resume_strategy', label: 'Tailoring resume...' },
+  { key: 'interview_preparation', label: 'Preparing interview materials...' },
+];
+
+const LoadingState: React.FC<LoadingStateProps> = ({ progress = {} }) => {
+  // Show the most recent output so users can start reading before the run ends
+  const latestOutput = [...STAGES]
+    .reverse()
+    .find((stage) => progress[stage.key]?.status === 'done');
+
   return (
     <motion.div
       className="glass-effect w-full max-w-4xl mx-auto p-8 md:p-10 mt-10 flex flex-col items-center justify-center"
@@ -15,39 +36,36 @@ const LoadingState: React.FC = () => {
           <div className="absolute inset-1 rounded-full bg-card"></div>
           <div className="absolute inset-0 rounded-full border-4 border-t-transparent border-primary animate-spin"></div>
         </div>
-        
+
         <div className="text-center space-y-4">
           <h3 className="text-xl font-medium text-primary">Creating Your Tailored Resume</h3>
           <div className="flex flex-col space-y-2">
-            <div className="flex items-center space-x-3">
-              <div className="w-6 h-6 rounded-full bg-primary flex items-center justify-center">
-                <span className="text-xs text-white">1</span>
-              </div>
-              <p className="text-primary">Analyzing job requirements...</p>
-            </div>
-            <div className="flex items-center space-x-3">
-              <div className="w-6 h-6 rounded-full bg-gray-700 flex items-center justify-center shimmer">
-                <span className="text-xs text-white">2</span>
-              </div>
-              <p className="text-secondary">Creating professional profile...</p>
-            </div>
-            <div className="flex items-center space-x-3">
-              <div className="w-6 h-6 rounded-full bg-gray-700 flex items-center justify-center">
-                <span className="text-xs text-white">3</span>
-              </div>
-              <p className="text-secondary">Tailoring resume...</p>
-            </div>
-            <div className="flex items-center space-x-3">
-              <div className="w-6 h-6 rounded-full bg-gray-700 flex items-center justify-center">
-                <span className="text-xs text-white">4</span>
-              </div>
-              <p className="text-secondary">Preparing interview materials...</p>
-            </div>
+            {STAGES.map((stage, index) => {
+              const status = progress[stage.key]?.status;
+              return (
+                <div key={stage.key} className="flex items-center space-x-3">
+                  <div
+                    className={`w-6 h-6 rounded-full flex items-center justify-center ${
+                      status ? 'bg-primary' : 'bg-gray-700'
+                    } ${status === 'running' ? 'shimmer' : ''}`}
+                  >
+                    <span className="text-xs text-white">{status === 'done' ? '✓' : index + 1}</span>
+                  </div>
+                  <p className={status ? 'text-primary' : 'text-secondary'}>{stage.label}</p>
+                </div>
+              );
+            })}
           </div>
         </div>
-        
+
+        {latestOutput && (
+          <div className="w-full max-h-64 overflow-y-auto text-left text-sm text-secondary whitespace-pre-wrap">
+            {progress[latestOutput.key].output}
+          </div>
+        )}
+
         <p className="text-tertiary text-sm mt-6 max-w-lg text-center">
-          This may take several minutes to complete. Our AI agents are working to create the best tailored resume 
+          This may take several minutes to complete. Our AI agents are working to create the best tailored resume
           and interview preparation materials for you.
         </p>
       </div>
@@ -55,4 +73,4 @@ const LoadingState: React.FC = () => {
   );
 };
 
-export default LoadingState; 
\ No newline at end of file
+export default LoadingState;
@@ -0,0 +1,131 @@
+import os
+import random
+from http.cookiejar import DefaultCookiePolicy
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", 32))
+HTTP_MAX_PER_HOST = int(os.environ.get("HTTP_MAX_PER_HOST", 8))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", 3))
+HTTP_BACKOFF_BASE = float(os.environ.get("HTTP_BACKOFF_BASE", 0.5))
+HTTP_BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", 20))
+
+# Requests per second and burst size allowed towards each host
+DEFAULT_RATE_LIMIT = (
+    float(os.environ.get("HTTP_HOST_RATE", 2)),
+    int(os.environ.get("HTTP_HOST_BURST", 5)),
+)
+HOST_RATE_LIMITS = {
+    "google.serper.dev": (
+        float(os.environ.get("SERPER_RATE", 10)),
+        int(os.environ.get("SERPER_BURST", 20)),
+    ),
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Blocking token bucket refilled at `rate` tokens per second."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RejectAllCookies(DefaultCookiePolicy):
+    """Cookie policy that stores nothing and sends nothing from the jar."""
+
+    def set_ok(self, cookie, request):
+        return False
+
+    def return_ok(self, cookie, request):
+        return False
+
+
+class HttpClient:
+    """
+    One keep-alive connection pool shared by the search and scrape tools of
+    every crew in the process.
+
+    Each host gets a concurrency cap and a token bucket, and 429/5xx
+    responses or connection errors are retried with jittered exponential
+    backoff, honouring Retry-After when the server sends it.
+
+    The session is shared by every user's crews, so it keeps no cookies;
+    callers that need some pass them per request (`cookies=`).
+    """
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, max_per_host=HTTP_MAX_PER_HOST,
+                 max_retries=HTTP_MAX_RETRIES):
+        self.max_per_host = max_per_host
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.cookies.set_policy(RejectAllCookies())
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _limits(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                rate, burst = HOST_RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT)
+                self._hosts[host] = (
+                    TokenBucket(rate, burst),
+                    threading.BoundedSemaphore(self.max_per_host),
+                )
+            return self._hosts[host]
+
+    def _backoff(self, attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), HTTP_BACKOFF_MAX)
+        # Full jitter keeps concurrent crews from retrying in lockstep
+        return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt))
+
+    def request(self, method, url, timeout=15, **kwargs):
+        bucket, semaphore = self._limits(urlsplit(url).hostname)
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            bucket.acquire()
+            with semaphore:
+                try:
+                    response = self.session.request(method, url, timeout=timeout, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    if last_attempt:
+                        raise
+                    response = None
+            if response is not None and (response.status_code not in RETRY_STATUSES or last_attempt):
+                return response
+            time.sleep(self._backoff(attempt, response))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+http_client = HttpClient()
@@ -0,0 +1,468 @@
+import asyncio
+import collections
+import contextlib
+import math
+import os
+import threading
+import time
+import uuid
+
+import metrics
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", 50))
+JOB_TTL_SECONDS = int(os.environ.get("JOB_TTL_SECONDS", 3600))
+# Batch jobs may use this many workers and fill this much of the queue, so
+# interactive requests always find a free worker and room to wait
+JOB_BATCH_WORKERS = int(os.environ.get("JOB_BATCH_WORKERS", max(1, JOB_WORKERS - 1)))
+JOB_BATCH_QUEUE_SIZE = int(os.environ.get("JOB_BATCH_QUEUE_SIZE", JOB_QUEUE_SIZE // 2))
+# Jobs one API key may have queued or running at once (0 for no limit)
+JOB_QUOTA_PER_KEY = int(os.environ.get("JOB_QUOTA_PER_KEY", 3))
+# Turn submissions away when they would wait longer than this (0 for no limit)
+JOB_MAX_WAIT_SECONDS = int(os.environ.get("JOB_MAX_WAIT_SECONDS", 0))
+
+# Priority classes, highest first: a single run someone is waiting on goes
+# ahead of batch runs
+PRIORITIES = ("interactive", "batch")
+
+
+class AdmissionError(Exception):
+    """
+    Raised when a job is not admitted. `retry_after` is how many seconds
+    the client should wait before submitting again.
+    """
+    reason = "rejected"
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueFullError(AdmissionError):
+    """Raised when the job queue cannot accept more work."""
+    reason = "queue_full"
+
+
+class QuotaExceededError(AdmissionError):
+    """Raised when an API key already has its share of jobs in flight."""
+    reason = "quota"
+
+
+class Job:
+    """
+    A single crew run tracked by the job queue.
+    """
+
+    def __init__(self, func, params, resume_key=None, dedupe_key=None, priority="interactive",
+                 quota_key=None):
+        self.id = uuid.uuid4().hex
+        self.resume_key = resume_key
+        self.dedupe_key = dedupe_key
+        self.priority = priority
+        self.quota_key = quota_key
+        self.func = func
+        self.params = params
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        self.trace = metrics.RequestTrace()
+        self._done = threading.Event()
+        self._cond = threading.Condition()
+        self._async_waiters = []
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def emit(self, event, data=None):
+        """Record a progress event and wake up anyone streaming this job."""
+        with self._cond:
+            self.events.append((event, data or {}))
+            self._cond.notify_all()
+            self._wake_async_waiters()
+
+    def finish(self, status, result=None, error=None):
+        with self._cond:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            metrics.job_duration.observe(
+                self.finished_at - (self.started_at or self.created_at),
+                getattr(self.func, "__name__", "job"), status
+            )
+            if status == "succeeded":
+                self.events.append(("job_succeeded", result))
+            else:
+                self.events.append(("job_failed", {"message": error}))
+            self._done.set()
+            self._cond.notify_all()
+            self._wake_async_waiters()
+
+    def iter_events(self, start=0, heartbeat=15):
+        """
+        Yield (index, event, data) tuples from start onwards as they arrive.
+
+        Yields None when nothing happened for `heartbeat` seconds so callers
+        can keep idle connections alive, and returns once the job is done
+        and every event has been delivered.
+        """
+        index = start
+        while True:
+            with self._cond:
+                if index >= len(self.events) and not self.done:
+                    self._cond.wait(heartbeat)
+                pending = self.events[index:]
+                finished = self.done
+            for event, data in pending:
+                yield index, event, data
+                index += 1
+            if not pending:
+                if finished:
+                    return
+                yield None
+
+    def _wake_async_waiters(self):
+        # Called with _cond held, from whichever thread emitted
+        for loop, wake in self._async_waiters:
+            loop.call_soon_threadsafe(wake.set)
+
+    @contextlib.contextmanager
+    def _async_wakeup(self):
+        wake = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), wake)
+        with self._cond:
+            self._async_waiters.append(waiter)
+        try:
+            yield wake
+        finally:
+            with self._cond:
+                self._async_waiters.remove(waiter)
+
+    async def wait_async(self):
+        """Like wait(), for event loops: waits without holding a thread."""
+        with self._async_wakeup() as wake:
+            while not self.done:
+                await wake.wait()
+                wake.clear()
+
+    async def aiter_events(self, start=0, heartbeat=15):
+        """
+        Async version of iter_events(), so an ASGI server can stream many
+        jobs from one event loop instead of a thread per connection.
+        """
+        index = start
+        with self._async_wakeup() as wake:
+            while True:
+                with self._cond:
+                    wake.clear()
+                    pending = self.events[index:]
+                    finished = self.done
+                for event, data in pending:
+                    yield index, event, data
+                    index += 1
+                if pending:
+                    continue
+                if finished:
+                    return
+                try:
+                    await asyncio.wait_for(wake.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "trace": self.trace.to_dict(),
+        }
+
+
+class ClientLimiter:
+    """
+    Admission for quick requests that don't go through the job queue: at
+    most `max_concurrent` run at once over all clients, and each client
+    spends `cost` units of a token bucket refilled at `rate` per second up
+    to `burst`. Rejections raise the same AdmissionErrors as the queue.
+    """
+
+    def __init__(self, name, max_concurrent, rate, burst):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.rate = rate
+        self.burst = burst
+        self._running = 0
+        self._buckets = {}  # client -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def _take(self, client, cost):
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < cost:
+            self._buckets[client] = (tokens, now)
+            raise QuotaExceededError(
+                "Too many requests from this client, please slow down",
+                max(1, math.ceil((cost - tokens) / self.rate))
+            )
+        self._buckets[client] = (tokens - cost, now)
+        if len(self._buckets) > 10000:
+            # Clients whose bucket has refilled are the same as new ones
+            full = self.burst / self.rate
+            self._buckets = {
+                key: value for key, value in self._buckets.items() if now - value[1] < full
+            }
+
+    @contextlib.contextmanager
+    def admit(self, client, cost=1):
+        with self._lock:
+            try:
+                if self._running >= self.max_concurrent:
+                    raise QueueFullError("Too many requests in progress, please retry later", 1)
+                self._take(client, min(cost, self.burst))
+            except AdmissionError as e:
+                metrics.jobs_rejected.inc(self.name, e.reason)
+                raise
+            self._running += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running -= 1
+
+
+class JobQueue:
+    """
+    Bounded, prioritised queue of crew runs worked off by a fixed pool of
+    threads.
+
+    Admission happens at submit time: a job is turned away with an
+    AdmissionError when the queue for its priority class is full, when its
+    API key already has `quota_per_key` jobs in flight, or when it would
+    wait longer than `max_wait` seconds. Workers take interactive jobs
+    first, and at most `batch_workers` of them run batch jobs at once.
+
+    At most `workers` crews run at once: an interactive job is one crew,
+    and batch jobs take a crew_slot() for every crew they run on their own
+    threads, so batches can't add crews on top of the cap.
+
+    Workers are started lazily on the first submit so the queue is safe to
+    create at import time in a process that gunicorn later forks.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_pending=JOB_QUEUE_SIZE, ttl=JOB_TTL_SECONDS,
+                 batch_workers=JOB_BATCH_WORKERS, max_batch_pending=JOB_BATCH_QUEUE_SIZE,
+                 quota_per_key=JOB_QUOTA_PER_KEY, max_wait=JOB_MAX_WAIT_SECONDS):
+        self.workers = workers
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self.quota_per_key = quota_per_key
+        self.max_wait = max_wait
+        self._slots = {"interactive": workers, "batch": min(batch_workers, workers)}
+        self._queue_limits = {"interactive": max_pending, "batch": min(max_batch_pending, max_pending)}
+        self._pending = {priority: collections.deque() for priority in PRIORITIES}
+        self._running = {priority: 0 for priority in PRIORITIES}
+        self._crews = 0
+        self._active_per_key = collections.Counter()
+        # Running average of job wall time per class, for Retry-After
+        self._job_seconds = {priority: 60.0 for priority in PRIORITIES}
+        self._jobs = {}
+        self._by_resume_key = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._work_available = threading.Condition(self._lock)
+        self._threads = []
+
+    def submit(self, func, params, resume_key=None, dedupe_key=None, priority="interactive",
+               quota_key=None):
+        """
+        Queue func(params, emit) and return its Job without waiting for it.
+
+        `emit(event, data)` lets the function publish progress on the job.
+        Submitting a `resume_key` whose job is queued, running or finished
+        returns that job instead of starting another; a failed one is
+        replaced by a new attempt. Likewise, while a job with the same
+        `dedupe_key` is queued or running, the submission attaches to it
+        and gets its events and result. Neither counts against the quota
+        of `quota_key`.
+
+        Raises QueueFullError or QuotaExceededError when the job is not
+        admitted.
+        """
+        self._ensure_workers()
+        self._prune()
+        with self._lock:
+            existing = self._by_resume_key.get(resume_key) if resume_key else None
+            if existing is not None and existing.status != "failed":
+                return existing
+            existing = self._in_flight.get(dedupe_key) if dedupe_key else None
+            if existing is not None:
+                metrics.jobs_coalesced.inc()
+                return existing
+            try:
+                self._admit(priority, quota_key)
+            except AdmissionError as e:
+                metrics.jobs_rejected.inc(priority, e.reason)
+                raise
+            job = Job(func, params, resume_key, dedupe_key, priority, quota_key)
+            self._jobs[job.id] = job
+            if resume_key:
+                self._by_resume_key[resume_key] = job
+            if dedupe_key:
+                self._in_flight[dedupe_key] = job
+            if quota_key:
+                self._active_per_key[quota_key] += 1
+            job.emit("job_queued", {"jobId": job.id, "priority": priority})
+            self._pending[priority].append(job)
+            self._work_available.notify_all()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queued_count(self):
+        with self._lock:
+            return sum(len(pending) for pending in self._pending.values())
+
+    def running_count(self):
+        with self._lock:
+            return sum(self._running.values())
+
+    def crew_count(self):
+        with self._lock:
+            return self._crews
+
+    @contextlib.contextmanager
+    def crew_slot(self):
+        """
+        Hold one of the `workers` crew slots while a batch job runs a crew.
+        Waits for a free slot, and lets a queued interactive job go first
+        when a worker is free to start it.
+        """
+        with self._work_available:
+            while self._crews >= self.workers or (
+                    self._pending["interactive"] and sum(self._running.values()) < self.workers):
+                self._work_available.wait()
+            self._crews += 1
+        try:
+            yield
+        finally:
+            with self._work_available:
+                self._crews -= 1
+                self._work_available.notify_all()
+
+    def _admit(self, priority, quota_key):
+        """Raise an AdmissionError if a new job can't be taken. Called with _lock held."""
+        queued = sum(len(pending) for pending in self._pending.values())
+        if queued >= self.max_pending or len(self._pending[priority]) >= self._queue_limits[priority]:
+            raise QueueFullError(
+                "Too many queued jobs, please retry later", self._retry_after(priority)
+            )
+        if self.quota_per_key > 0 and quota_key and \
+                self._active_per_key[quota_key] >= self.quota_per_key:
+            raise QuotaExceededError(
+                f"This API key already has {self.quota_per_key} jobs queued or running, "
+                "please wait for one to finish",
+                self._retry_after(priority, self._job_seconds[priority])
+            )
+        if self.max_wait > 0 and self._estimated_wait(priority) > self.max_wait:
+            raise QueueFullError(
+                "The server is too busy to start this job soon, please retry later",
+                self._retry_after(priority)
+            )
+
+    def _estimated_wait(self, priority):
+        """
+        Seconds until a new job of this class would start: the jobs ahead
+        of it (running ones included) worked off in rounds of its slots.
+        """
+        if priority == "interactive":
+            ahead = len(self._pending["interactive"]) + sum(self._running.values())
+        else:
+            ahead = len(self._pending["interactive"]) + len(self._pending["batch"]) + \
+                self._running["batch"]
+        return (ahead // self._slots[priority]) * self._job_seconds[priority]
+
+    def _retry_after(self, priority, seconds=None):
+        if seconds is None:
+            seconds = self._estimated_wait(priority)
+        return max(1, math.ceil(seconds))
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"crew-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _next_job(self):
+        """Block until a job can run: interactive first, batch while it has slots."""
+        with self._work_available:
+            while True:
+                for priority in PRIORITIES:
+                    if not self._pending[priority] or self._running[priority] >= self._slots[priority]:
+                        continue
+                    if priority == "interactive":
+                        if self._crews >= self.workers:
+                            continue
+                        self._crews += 1
+                    self._running[priority] += 1
+                    return self._pending[priority].popleft()
+                self._work_available.wait()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            job.status = "running"
+            job.started_at = time.time()
+            job.emit("job_started")
+            params, job.params = job.params, None  # Don't keep API keys around
+            try:
+                with metrics.bind(job.trace):
+                    result = job.func(params, job.emit)
+                job.finish("succeeded", result=result)
+            except Exception as e:
+                print(f"Error: {str(e)}")
+                job.finish("failed", error=str(e))
+            finally:
+                with self._lock:
+                    if self._in_flight.get(job.dedupe_key) is job:
+                        del self._in_flight[job.dedupe_key]
+                    if job.quota_key:
+                        self._active_per_key[job.quota_key] -= 1
+                        if self._active_per_key[job.quota_key] <= 0:
+                            del self._active_per_key[job.quota_key]
+                    self._running[job.priority] -= 1
+                    if job.priority == "interactive":
+                        self._crews -= 1
+                    elapsed = time.time() - job.started_at
+                    self._job_seconds[job.priority] += 0.2 * (elapsed - self._job_seconds[job.priority])
+                    self._work_available.notify_all()
+
+    def _prune(self):
+        """Forget finished jobs older than the TTL."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.done and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                job = self._jobs.pop(job_id)
+                if self._by_resume_key.get(job.resume_key) is job:
+                    del self._by_resume_key[job.resume_key]
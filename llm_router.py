@@ -0,0 +1,247 @@
+"""
+Chat models for the crew's agents: per-agent model tiers, failover across
+providers and hedged requests.
+
+Each agent asks for a tier ("fast" for extraction work, "strong" for
+writing). When the request carries keys for more than one provider, calls
+that time out or fail with a 5xx are retried on the next provider, and
+with LLM_HEDGE_AFTER set a call that is still running after that many
+seconds gets a second request, racing the first.
+"""
+import functools
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatResult
+
+import metrics
+from crew_specs import MODEL_TIERS  # noqa: F401 (re-exported)
+
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 120))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 1))
+# Seconds before a slow call is hedged; 0 turns hedging off
+LLM_HEDGE_AFTER = float(os.environ.get("LLM_HEDGE_AFTER", 0))
+LLM_HEDGE_POOL_SIZE = int(os.environ.get("LLM_HEDGE_POOL_SIZE", 32))
+# Connections kept open to the OpenAI API, shared by every agent
+LLM_POOL_SIZE = int(os.environ.get("LLM_POOL_SIZE", 32))
+
+# Errors raised by the openai, anthropic and httpx clients for timeouts
+# and dropped connections
+FAILOVER_ERRORS = {
+    "APITimeoutError", "APIConnectionError", "Timeout", "TimeoutException",
+    "ReadTimeout", "ConnectTimeout", "ConnectError", "RemoteProtocolError",
+}
+
+_hedge_pool = ThreadPoolExecutor(max_workers=LLM_HEDGE_POOL_SIZE, thread_name_prefix="llm-hedge")
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding():
+    import tiktoken
+
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text):
+    """Token count of text with cl100k_base, close enough for other models too."""
+    return len(_encoding().encode(text, disallowed_special=()))
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """
+    Records wall time and token usage of every LLM call in metrics.
+
+    Streamed calls (crewai's agents stream) come back without usage, so the
+    prompt is counted when the call starts and the completion one token per
+    streamed chunk, the way crewai's own TokenCalcHandler does.
+    """
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self._started = {}
+        self._prompt_tokens = {}
+        self._completion_tokens = {}
+
+    def _start(self, run_id, texts):
+        self._started[run_id] = time.perf_counter()
+        self._prompt_tokens[run_id] = sum(count_tokens(text) for text in texts)
+        self._completion_tokens[run_id] = 0
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, [str(message.content) for batch in messages for message in batch])
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, prompts)
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        if run_id in self._completion_tokens:
+            self._completion_tokens[run_id] += 1
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+        self._prompt_tokens.pop(run_id, None)
+        self._completion_tokens.pop(run_id, None)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        seconds = time.perf_counter() - started if started is not None else 0.0
+        prompt_tokens = self._prompt_tokens.pop(run_id, 0)
+        completion_tokens = self._completion_tokens.pop(run_id, 0)
+        output = response.llm_output or {}
+        # OpenAI reports token_usage, Anthropic reports usage
+        usage = output.get("token_usage") or output.get("usage") or {}
+        if usage:
+            prompt_tokens = usage.get("prompt_tokens", usage.get("input_tokens", 0))
+            completion_tokens = usage.get("completion_tokens", usage.get("output_tokens", 0))
+        elif not completion_tokens:
+            completion_tokens = sum(
+                count_tokens(generation.text)
+                for generations in response.generations for generation in generations
+            )
+        metrics.record_llm_call(self.model_name, seconds, prompt_tokens, completion_tokens)
+
+
+def should_fail_over(error):
+    """True for timeouts, dropped connections and 5xx responses."""
+    if isinstance(error, TimeoutError) or type(error).__name__ in FAILOVER_ERRORS:
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+@functools.lru_cache(maxsize=None)
+def openai_http_client():
+    """
+    One keep-alive connection pool for every OpenAI chat model in the
+    process, instead of a new client (and TLS handshake) per agent. The
+    key travels per request, so the pool holds no credentials.
+    """
+    import httpx
+
+    return httpx.Client(
+        timeout=LLM_TIMEOUT,
+        limits=httpx.Limits(max_connections=LLM_POOL_SIZE, max_keepalive_connections=LLM_POOL_SIZE),
+    )
+
+
+# A forked worker must not reuse the parent's connections
+os.register_at_fork(after_in_child=openai_http_client.cache_clear)
+
+
+def make_chat_model(provider, model_name, api_key):
+    """
+    A chat model for one provider, reporting its calls to metrics. OpenAI
+    models share openai_http_client(); langchain_anthropic does not take
+    a client, so Anthropic models each open their own.
+    """
+    callbacks = [LLMMetricsHandler(model_name)]
+    if provider == "anthropic":
+        from langchain_anthropic import ChatAnthropic
+
+        return ChatAnthropic(
+            model=model_name,
+            anthropic_api_key=api_key,
+            timeout=LLM_TIMEOUT,
+            max_retries=LLM_MAX_RETRIES,
+            callbacks=callbacks
+        )
+
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=model_name,
+        openai_api_key=api_key,
+        timeout=LLM_TIMEOUT,
+        max_retries=LLM_MAX_RETRIES,
+        http_client=openai_http_client(),
+        callbacks=callbacks
+    )
+
+
+class RoutedChatModel(BaseChatModel):
+    """
+    Chat model that tries `candidates` in order, moving on when a call
+    times out or fails with a 5xx, and hedges calls slower than
+    `hedge_after` seconds with a request to the next candidate (or the same
+    one again when there is no other).
+    """
+    candidates: List[Any]
+    hedge_after: Optional[float] = None
+    model_name: str = ""
+
+    @property
+    def _llm_type(self):
+        return "routed-chat"
+
+    def _call(self, candidate, messages, stop, trace, stage, **kwargs):
+        # Runs on a pool thread when hedging, so carry the caller's trace over
+        with metrics.bind(trace, stage):
+            result = candidate.generate([messages], stop=stop, **kwargs)
+        return ChatResult(generations=result.generations[0], llm_output=result.llm_output)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        trace, stage = metrics.current_trace(), metrics.current_stage()
+        if not self.hedge_after:
+            error = None
+            for candidate in self.candidates:
+                try:
+                    return self._call(candidate, messages, stop, trace, stage, **kwargs)
+                except Exception as e:
+                    if not should_fail_over(e):
+                        raise
+                    print(f"LLM call failed, trying next provider: {str(e)}")
+                    error = e
+            raise error
+
+        queue = list(self.candidates)
+        pending = {}
+        hedged = False
+        error = None
+
+        def launch(candidate):
+            future = _hedge_pool.submit(self._call, candidate, messages, stop, trace, stage, **kwargs)
+            pending[future] = candidate
+
+        launch(queue.pop(0))
+        while pending:
+            timeout = self.hedge_after if not hedged else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                launch(queue.pop(0) if queue else self.candidates[0])
+                continue
+            for future in done:
+                pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    if not should_fail_over(e):
+                        raise
+                    print(f"LLM call failed, trying next provider: {str(e)}")
+                    error = e
+            if not pending and queue:
+                launch(queue.pop(0))
+        raise error
+
+
+def build_llm(providers, hedge_after=LLM_HEDGE_AFTER):
+    """
+    Chat model for one agent. `providers` lists (provider, model_name,
+    api_key) in order of preference.
+
+    A single provider without hedging gets the plain provider model.
+    """
+    candidates = [make_chat_model(*provider) for provider in providers]
+    if len(candidates) == 1 and not hedge_after:
+        return candidates[0]
+    return RoutedChatModel(
+        candidates=candidates,
+        hedge_after=hedge_after or None,
+        model_name=providers[0][1],
+    )
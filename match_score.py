@@ -0,0 +1,174 @@
+"""
+Local, deterministic match score between a job posting and a resume.
+
+Both texts are reduced to counts over a fixed skills vocabulary, and the
+score is the share of the posting's skills (weighted by how often the
+posting mentions them) that the resume covers. No LLM is involved, so a
+score takes milliseconds and many postings can be triaged before paying
+for a crew run. Resume vectors are cached on disk by content.
+"""
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+from storage import DiskCache
+
+MATCH_CACHE_TTL = int(os.environ.get("MATCH_CACHE_TTL", 30 * 24 * 3600))
+
+# Canonical skill name -> spellings to look for (case-insensitive, whole
+# words). Spellings that are also common English words ("rest", "node",
+# "spring") are left out or only listed in unambiguous forms.
+SKILLS_VOCABULARY = {
+    "Python": ("python",),
+    "JavaScript": ("javascript", "js", "ecmascript"),
+    "TypeScript": ("typescript",),
+    "Java": ("java",),
+    "Go": ("golang",),
+    "C++": ("c++", "cpp"),
+    "C#": ("c#", ".net", "dotnet"),
+    "Rust": ("rust",),
+    "Ruby": ("ruby", "rails", "ruby on rails"),
+    "PHP": ("php", "laravel"),
+    "Scala": ("scala",),
+    "Kotlin": ("kotlin",),
+    "Swift": ("swiftui", "ios"),
+    "SQL": ("sql",),
+    "HTML/CSS": ("html", "html5", "css", "tailwind", "sass"),
+    "React": ("react", "react.js", "reactjs"),
+    "Next.js": ("next.js", "nextjs"),
+    "Vue": ("vue", "vue.js", "vuejs"),
+    "Angular": ("angular",),
+    "Node.js": ("node.js", "nodejs", "express.js"),
+    "Django": ("django",),
+    "Flask": ("flask",),
+    "FastAPI": ("fastapi",),
+    "Spring": ("spring boot", "spring framework"),
+    "REST APIs": ("restful", "rest api", "rest apis"),
+    "GraphQL": ("graphql",),
+    "gRPC": ("grpc",),
+    "PostgreSQL": ("postgresql", "postgres"),
+    "MySQL": ("mysql",),
+    "MongoDB": ("mongodb", "mongo"),
+    "Redis": ("redis",),
+    "DynamoDB": ("dynamodb",),
+    "Elasticsearch": ("elasticsearch", "opensearch"),
+    "Kafka": ("kafka",),
+    "RabbitMQ": ("rabbitmq",),
+    "Spark": ("spark", "pyspark"),
+    "Flink": ("flink",),
+    "Airflow": ("airflow",),
+    "Snowflake": ("snowflake",),
+    "AWS": ("aws", "amazon web services"),
+    "GCP": ("gcp", "google cloud"),
+    "Azure": ("azure",),
+    "Docker": ("docker", "containers"),
+    "Kubernetes": ("kubernetes", "k8s"),
+    "Terraform": ("terraform", "infrastructure as code"),
+    "CI/CD": ("ci/cd", "continuous integration", "continuous delivery", "github actions", "jenkins",
+              "devops"),
+    "Linux": ("linux", "unix"),
+    "Microservices": ("microservices", "microservice"),
+    "Distributed systems": ("distributed systems", "distributed system"),
+    "Event-driven architecture": ("event-driven", "event driven", "message queues", "message queue"),
+    "Observability": ("observability", "monitoring", "slos", "slo", "alerting"),
+    "Machine learning": ("machine learning", "ml", "ai/ml", "scikit-learn", "sklearn"),
+    "Deep learning": ("deep learning", "neural networks"),
+    "TensorFlow": ("tensorflow",),
+    "PyTorch": ("pytorch",),
+    "LLMs": ("llm", "llms", "large language model", "large language models", "genai",
+             "generative ai"),
+    "NLP": ("nlp", "natural language processing"),
+    "Computer vision": ("computer vision",),
+    "Data science": ("data science", "data scientist"),
+    "Data engineering": ("data engineering", "etl", "data pipelines", "data pipeline"),
+    "Pandas": ("pandas",),
+    "Security": ("security", "oauth", "authentication"),
+    "Testing": ("testing", "unit tests", "tdd", "pytest", "jest"),
+    "Agile": ("agile", "scrum", "kanban"),
+    "Leadership": ("leadership", "team management", "managing teams", "led a team", "led teams"),
+    "Mentoring": ("mentoring", "mentor", "mentored", "coaching"),
+    "Product management": ("product management", "product manager", "roadmap"),
+    "Communication": ("communication", "stakeholders", "stakeholder"),
+    "Startups": ("startup", "startups", "early-stage", "early stage"),
+}
+
+# Bumped whenever the vocabulary or vectorization changes, so cached
+# resume vectors are computed again
+VOCABULARY_VERSION = 1
+
+# "Go" is only taken as the language when it is capitalised inside a list
+# such as "Python, Go and Rust"
+CASE_SENSITIVE_PATTERNS = {
+    "Go": re.compile(r"(?:(?<=, )|(?<=/)|(?<=and )|(?<=or ))Go\b|\bGo(?=,|/| and | or )"),
+}
+
+SKILL_NAMES = list(SKILLS_VOCABULARY)
+_ALIAS_INDEX = {
+    alias: index for index, aliases in enumerate(SKILLS_VOCABULARY.values()) for alias in aliases
+}
+# One pass over the text for every spelling; longest first so "react.js"
+# wins over "react"
+_ALIAS_PATTERN = re.compile(
+    r"(?<![\w+#.])("
+    + "|".join(re.escape(alias) for alias in sorted(_ALIAS_INDEX, key=len, reverse=True))
+    + r")(?![\w+#])",
+    re.I,
+)
+
+resume_vector_cache = DiskCache("match_vectors", ttl=MATCH_CACHE_TTL)
+
+
+def skill_counts(text):
+    """How often each vocabulary skill is mentioned, as a vector."""
+    indices = [_ALIAS_INDEX[alias.lower()] for alias in _ALIAS_PATTERN.findall(text)]
+    for name, pattern in CASE_SENSITIVE_PATTERNS.items():
+        indices += [SKILL_NAMES.index(name)] * len(pattern.findall(text))
+    return np.bincount(indices, minlength=len(SKILL_NAMES)).astype(np.float32)
+
+
+def resume_vector(resume_text):
+    """skill_counts() of a resume, from the cache when this resume was seen before."""
+    key = hashlib.sha256(f"{VOCABULARY_VERSION}:{resume_text}".encode("utf-8")).hexdigest()
+    cached = resume_vector_cache.get(key)
+    if cached is not None:
+        return np.array(json.loads(cached), dtype=np.float32)
+    vector = skill_counts(resume_text)
+    resume_vector_cache.set(key, json.dumps(vector.tolist()))
+    return vector
+
+
+def score_postings(resume_text, posting_texts):
+    """
+    Score one resume against many postings at once.
+
+    Returns one dict per posting with `score` (0-100, the weighted share of
+    the posting's skills the resume mentions), `matchedSkills` and
+    `missingSkills` (most mentioned first).
+    """
+    resume = resume_vector(resume_text) > 0
+    postings = np.stack([skill_counts(text) for text in posting_texts]) if posting_texts else \
+        np.zeros((0, len(SKILL_NAMES)), dtype=np.float32)
+    # A skill named five times matters more than one named once, but not
+    # five times more
+    weights = np.log1p(postings)
+    totals = weights.sum(axis=1)
+    covered = weights @ resume.astype(np.float32)
+    scores = np.divide(covered, totals, out=np.zeros_like(totals), where=totals > 0) * 100
+
+    results = []
+    for row, score in zip(weights, scores):
+        order = np.argsort(-row, kind="stable")
+        wanted = [index for index in order if row[index] > 0]
+        results.append({
+            "score": round(float(score), 1),
+            "matchedSkills": [SKILL_NAMES[index] for index in wanted if resume[index]],
+            "missingSkills": [SKILL_NAMES[index] for index in wanted if not resume[index]],
+        })
+    return results
+
+
+def score_posting(resume_text, posting_text):
+    return score_postings(resume_text, [posting_text])[0]
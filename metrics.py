@@ -0,0 +1,252 @@
+"""
+In-process metrics for crew runs, exposed in Prometheus text format.
+
+Every job gets a RequestTrace that is bound to the threads working on it,
+so stage, tool, LLM and cache measurements land both in the process-wide
+histograms and in the trace of the request that caused them.
+"""
+import bisect
+import contextlib
+import threading
+import time
+
+STAGE_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600)
+TOOL_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LLM_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+_registry = []
+_local = threading.local()
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, values)} {total}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose value is read from a callback at scrape time."""
+
+    def __init__(self, name, help, callback):
+        self.name = name
+        self.help = help
+        self.callback = callback
+        _registry.append(self)
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge",
+                f"{self.name} {self.callback()}"]
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=STAGE_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            counts, total = self._series.get(label_values, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._series[label_values] = (counts, total + value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for values, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    labels = _format_labels(self.labels, values, [("le", bound)])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labels, values)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render():
+    """All registered metrics in Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+job_duration = Histogram(
+    "crew_job_duration_seconds", "Wall time of crew jobs.", ("kind", "status"), STAGE_BUCKETS
+)
+stage_duration = Histogram(
+    "crew_stage_duration_seconds", "Wall time of each crew task.", ("stage",), STAGE_BUCKETS
+)
+tool_duration = Histogram(
+    "crew_tool_duration_seconds", "Wall time of agent tool calls.", ("tool",), TOOL_BUCKETS
+)
+tool_errors = Counter("crew_tool_errors_total", "Agent tool calls that raised.", ("tool",))
+llm_duration = Histogram(
+    "crew_llm_call_duration_seconds", "Wall time of LLM calls.", ("model",), LLM_BUCKETS
+)
+llm_tokens = Counter("crew_llm_tokens_total", "LLM tokens used.", ("model", "type"))
+cache_lookups = Counter("crew_cache_lookups_total", "Cache lookups.", ("cache", "result"))
+stage_output_invalid = Counter(
+    "crew_stage_output_invalid_total", "Stage outputs that did not match their schema.", ("stage",)
+)
+jobs_coalesced = Counter(
+    "crew_jobs_coalesced_total", "Submissions attached to an identical job already in flight."
+)
+jobs_rejected = Counter(
+    "crew_jobs_rejected_total", "Submissions turned away by admission control.",
+    ("priority", "reason")
+)
+
+
+class RequestTrace:
+    """Measurements for one job, broken down by stage, tool and cache."""
+
+    def __init__(self):
+        self.stages = {}
+        self.tools = {}
+        self.caches = {}
+        self._lock = threading.Lock()
+
+    def _stage(self, stage):
+        return self.stages.setdefault(stage or "setup", {
+            "runs": 0, "seconds": 0.0, "llm_calls": 0, "prompt_tokens": 0,
+            "completion_tokens": 0, "tool_calls": 0,
+        })
+
+    def add_stage(self, stage, seconds):
+        with self._lock:
+            entry = self._stage(stage)
+            entry["runs"] += 1
+            entry["seconds"] += seconds
+
+    def add_tool(self, stage, tool, seconds):
+        with self._lock:
+            self._stage(stage)["tool_calls"] += 1
+            entry = self.tools.setdefault(tool, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+
+    def add_llm_call(self, stage, prompt_tokens, completion_tokens):
+        with self._lock:
+            entry = self._stage(stage)
+            entry["llm_calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+
+    def add_cache_lookup(self, cache, hit):
+        with self._lock:
+            entry = self.caches.setdefault(cache, {"hits": 0, "misses": 0})
+            entry["hits" if hit else "misses"] += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "stages": {k: dict(v) for k, v in self.stages.items()},
+                "tools": {k: dict(v) for k, v in self.tools.items()},
+                "caches": {k: dict(v) for k, v in self.caches.items()},
+            }
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+def current_stage():
+    return getattr(_local, "stage", None)
+
+
+@contextlib.contextmanager
+def bind(trace, stage=None):
+    """Attribute measurements taken on this thread to `trace` and `stage`."""
+    previous = (current_trace(), current_stage())
+    _local.trace = trace
+    _local.stage = stage if stage is not None else previous[1]
+    try:
+        yield
+    finally:
+        _local.trace, _local.stage = previous
+
+
+@contextlib.contextmanager
+def stage_span(trace, stage):
+    start = time.perf_counter()
+    with bind(trace, stage):
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            stage_duration.observe(seconds, stage)
+            if trace:
+                trace.add_stage(stage, seconds)
+
+
+@contextlib.contextmanager
+def tool_span(tool):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        tool_errors.inc(tool)
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        tool_duration.observe(seconds, tool)
+        trace = current_trace()
+        if trace:
+            trace.add_tool(current_stage(), tool, seconds)
+
+
+def record_llm_call(model, seconds, prompt_tokens, completion_tokens):
+    llm_duration.observe(seconds, model)
+    llm_tokens.inc(model, "prompt", amount=prompt_tokens)
+    llm_tokens.inc(model, "completion", amount=completion_tokens)
+    trace = current_trace()
+    if trace:
+        trace.add_llm_call(current_stage(), prompt_tokens, completion_tokens)
+
+
+def record_cache_lookup(cache, hit):
+    cache_lookups.inc(cache, "hit" if hit else "miss")
+    trace = current_trace()
+    if trace:
+        trace.add_cache_lookup(cache, hit)
+
+
+class TracedTool:
+    """
+    Mixin for crewai tools that times every call under `metric_name`.
+    Put it before the tool class: class TracedX(TracedTool, XTool).
+    """
+
+    def _run(self, *args, **kwargs):
+        with tool_span(self.metric_name):
+            return super()._run(*args, **kwargs)
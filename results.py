@@ -0,0 +1,45 @@
+"""
+Finished results, stored once under the hash of their content.
+
+A result can be fetched again by its ID, whole or one artifact at a time,
+without another crew run. Because the ID is the content hash it never
+changes meaning, so it doubles as a strong ETag and responses can be
+cached for as long as the result is kept.
+"""
+import hashlib
+import json
+import os
+import re
+
+from storage import DiskCache
+
+RESULT_TTL = int(os.environ.get("RESULT_TTL", 30 * 24 * 3600))
+RESULT_MAX_BYTES = int(os.environ.get("RESULT_MAX_BYTES", 200 * 1024 * 1024))
+
+# Artifact name in URLs -> field of the result
+ARTIFACTS = {
+    "resume": "tailoredResume",
+    "interview-materials": "interviewMaterials",
+    "research": "researchNotes",
+    "profile": "profile",
+}
+
+RESULT_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+result_store = DiskCache("results", ttl=RESULT_TTL, max_bytes=RESULT_MAX_BYTES)
+
+
+def store_result(result):
+    """Store a result and return its ID. Storing the same result again is a no-op."""
+    value = json.dumps(result, sort_keys=True, separators=(",", ":"))
+    key = hashlib.sha256(value.encode("utf-8")).hexdigest()
+    result_store.set(key, value)
+    return key
+
+
+def load_result(key):
+    """Return the stored result for an ID, or None if unknown or expired."""
+    if not RESULT_ID_PATTERN.match(key):
+        return None
+    value = result_store.get(key)
+    return json.loads(value) if value is not None else None
@@ -0,0 +1,174 @@
+import base64
+import hashlib
+import json
+import os
+import re
+from typing import Any, Type
+
+import numpy as np
+from crewai_tools import BaseTool
+from pydantic.v1 import BaseModel, Field
+
+from metrics import tool_span
+from storage import DiskCache
+
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "text-embedding-ada-002")
+EMBEDDING_CACHE_TTL = int(os.environ.get("EMBEDDING_CACHE_TTL", 30 * 24 * 3600))
+EMBEDDING_CACHE_MAX_BYTES = int(os.environ.get("EMBEDDING_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+CHUNK_SIZE = 1000
+TOP_K = 3
+
+# Vectors are stored per chunk, so an edited resume only embeds the chunks
+# that changed; the chunk list of each resume version is stored separately
+embedding_cache = DiskCache(
+    "embeddings", ttl=EMBEDDING_CACHE_TTL, max_bytes=EMBEDDING_CACHE_MAX_BYTES
+)
+resume_chunks_cache = DiskCache(
+    "resume_chunks", ttl=EMBEDDING_CACHE_TTL, max_bytes=EMBEDDING_CACHE_MAX_BYTES // 10
+)
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_markdown(text, size=CHUNK_SIZE):
+    """
+    Split markdown into chunks of at most `size` characters, breaking at
+    headings first and at paragraph boundaries inside long sections.
+    """
+    sections = re.split(r"\n(?=#{1,6} )", text)
+    chunks = []
+    for section in sections:
+        current = ""
+        for paragraph in re.split(r"\n\s*\n", section):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if current and len(current) + len(paragraph) + 2 > size:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+            while len(current) > size:
+                chunks.append(current[:size])
+                current = current[size:]
+        if current:
+            chunks.append(current)
+
+    # Fold short pieces such as a lone title heading into their neighbour
+    merged = []
+    for chunk in chunks:
+        if merged and len(merged[-1]) + len(chunk) + 2 <= size // 2:
+            merged[-1] = f"{merged[-1]}\n\n{chunk}"
+        else:
+            merged.append(chunk)
+    return merged
+
+
+class OpenAIEmbedder:
+    def __init__(self, api_key, model=EMBEDDING_MODEL):
+        from openai import OpenAI
+
+        self.name = model
+        self._client = OpenAI(api_key=api_key)
+
+    def embed(self, texts):
+        response = self._client.embeddings.create(model=self.name, input=texts)
+        return [item.embedding for item in response.data]
+
+
+class HashingEmbedder:
+    """
+    Local bag-of-words embedder used when no OpenAI key is available, so
+    Anthropic-only requests can still search the resume.
+    """
+
+    def __init__(self, dimensions=512):
+        self.name = f"hashing-{dimensions}"
+        self.dimensions = dimensions
+
+    def embed(self, texts):
+        vectors = []
+        for text in texts:
+            vector = np.zeros(self.dimensions, dtype=np.float32)
+            for word in re.findall(r"[a-z0-9+#.]+", text.lower()):
+                index = int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % self.dimensions
+                vector[index] += 1.0
+            vectors.append(vector)
+        return vectors
+
+
+def embed_texts(texts, embedder):
+    """
+    Return a normalized (len(texts), dims) matrix, embedding only the texts
+    whose vectors are not cached yet.
+    """
+    keys = [f"{embedder.name}:{_sha256(text)}" for text in texts]
+    vectors = [None] * len(texts)
+    missing = []
+    for i, key in enumerate(keys):
+        cached = embedding_cache.get(key)
+        if cached is not None:
+            vectors[i] = np.frombuffer(base64.b64decode(cached), dtype=np.float32)
+        else:
+            missing.append(i)
+
+    if missing:
+        embedded = embedder.embed([texts[i] for i in missing])
+        for i, vector in zip(missing, embedded):
+            vector = np.asarray(vector, dtype=np.float32)
+            embedding_cache.set(keys[i], base64.b64encode(vector.tobytes()).decode("ascii"))
+            vectors[i] = vector
+
+    matrix = np.vstack(vectors)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def resume_chunks(text):
+    """Chunks for a resume version, cached by the resume's content hash."""
+    key = _sha256(text)
+    cached = resume_chunks_cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+    chunks = chunk_markdown(text)
+    resume_chunks_cache.set(key, json.dumps(chunks))
+    return chunks
+
+
+class ResumeSearchToolSchema(BaseModel):
+    """Input for ResumeSearchTool."""
+    search_query: str = Field(..., description="Mandatory search query you want to use to search the resume's content")
+
+
+class ResumeSearchTool(BaseTool):
+    name: str = "Search the resume's content"
+    description: str = "A tool that can be used to semantic search a query from the candidate's resume."
+    args_schema: Type[BaseModel] = ResumeSearchToolSchema
+    chunks: list = []
+    vectors: Any = None
+    embedder: Any = None
+
+    def _run(
+        self,
+        search_query: str,
+        **kwargs: Any,
+    ) -> Any:
+        if not self.chunks:
+            return "Relevant Content:\n"
+        with tool_span("resume_search"):
+            query = embed_texts([search_query], self.embedder)[0]
+            scores = self.vectors @ query
+            best = np.argsort(scores)[::-1][:TOP_K]
+        return "Relevant Content:\n" + "\n\n".join(self.chunks[i] for i in best)
+
+
+def build_resume_search_tool(resume_text, openai_api_key=None):
+    """
+    Semantic search over a resume backed by the persistent embedding index,
+    replacing a per-request MDXSearchTool that re-embedded everything.
+    """
+    embedder = OpenAIEmbedder(openai_api_key) if openai_api_key else HashingEmbedder()
+    chunks = resume_chunks(resume_text)
+    vectors = embed_texts(chunks, embedder) if chunks else None
+    return ResumeSearchTool(chunks=chunks, vectors=vectors, embedder=embedder)
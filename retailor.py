@@ -0,0 +1,109 @@
+"""
+Incremental re-tailoring when only the personal write-up changes.
+
+Every run stores its outputs under a session key (posting, profile, model
+and the submitter's API key hash, so nobody else can read them back).
+When a later request for the same session asks to re-tailor, the new
+write-up is compared with the stored one section by section (summary,
+experience, skills, education, ...), and only the sections that changed
+are rewritten and spliced into the stored tailored resume. Free-text
+write-ups without sections have nothing to line up with the resume's
+sections, so an edit to one redoes the whole resume.
+"""
+import hashlib
+import json
+import os
+
+from schemas import markdown_sections, section_kind
+from scrape_cache import normalize_url
+from storage import DiskCache
+
+TAILORING_CACHE_TTL = int(os.environ.get("TAILORING_CACHE_TTL", 24 * 3600))
+TAILORING_CACHE_MAX_BYTES = int(os.environ.get("TAILORING_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+
+tailoring_cache = DiskCache(
+    "tailoring", ttl=TAILORING_CACHE_TTL, max_bytes=TAILORING_CACHE_MAX_BYTES
+)
+
+HEADER = "header"
+
+
+def session_key(job_posting_url, linkedin_url, llm_provider, model_name, owner):
+    """
+    `owner` identifies the submitter (a hash of their API key), so knowing
+    the posting and profile URLs is not enough to get someone's documents.
+    """
+    session = json.dumps([
+        normalize_url(job_posting_url), linkedin_url.strip(), llm_provider, model_name or "default",
+        owner
+    ])
+    return hashlib.sha256(session.encode("utf-8")).hexdigest()
+
+
+def load_session(key):
+    value = tailoring_cache.get(key)
+    return json.loads(value) if value is not None else None
+
+
+def save_session(key, writeup, research, profile, tailored_resume, interview_materials):
+    tailoring_cache.set(key, json.dumps({
+        "writeup": writeup,
+        "research": research,
+        "profile": profile,
+        "tailoredResume": tailored_resume,
+        "interviewMaterials": interview_materials,
+    }))
+
+
+def split_sections(markdown):
+    """
+    Split a markdown resume into an ordered dict of section key to text
+    (heading included), using the same sections as TailoredResume.
+    Everything before the first section (name, title, contact details) is
+    kept under HEADER.
+    """
+    header, level, sections = markdown_sections(markdown)
+    if not sections:
+        return {HEADER: header}
+
+    keyed = {HEADER: header} if header else {}
+    for title, content in sections:
+        key = section_kind(title) or title.strip().lower()
+        # Repeated or unrecognised names still get a key of their own
+        while key in keyed:
+            key += "+"
+        keyed[key] = f"{'#' * level} {title}\n{content}".rstrip()
+    return keyed
+
+
+def has_sections(markdown):
+    return bool(markdown_sections(markdown)[2])
+
+
+def _normalized(text):
+    # Separators, bullets and whitespace are not edits
+    return " ".join(word for word in text.split() if word.strip("-*_"))
+
+
+def diff_sections(old_writeup, new_writeup):
+    """Return (changed or added, removed) section keys of the write-up."""
+    old, new = split_sections(old_writeup), split_sections(new_writeup)
+    changed = [key for key in new if key not in old or _normalized(new[key]) != _normalized(old[key])]
+    removed = [key for key in old if key not in new]
+    return changed, removed
+
+
+def merge_sections(tailored_resume, rewritten, changed, removed):
+    """
+    Splice the rewritten sections into the previous tailored resume.
+
+    Sections the write-up dropped are removed; new ones go at the end.
+    """
+    merged = split_sections(tailored_resume)
+    replacements = split_sections(rewritten)
+    for key in removed:
+        merged.pop(key, None)
+    for key in changed:
+        if key in replacements:
+            merged[key] = replacements[key]
+    return "\n\n".join(merged.values()) + "\n"
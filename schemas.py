@@ -0,0 +1,191 @@
+"""
+Typed outputs of the research, profile and resume strategy stages.
+
+The researcher and profiler answer with a JSON object that is validated
+against JobRequirements and CandidateProfile. Later tasks get a compact
+rendering of it (`to_context`) instead of the agent's free-form answer,
+which keeps their prompts short. The tailored resume stays markdown, but
+is split into typed sections so the API can return them without
+re-parsing files.
+"""
+import json
+import re
+from typing import List
+
+from pydantic import BaseModel, model_validator
+
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+CODE_FENCE = re.compile(r"^\s*```[a-zA-Z]*\s*\n(.*?)\n\s*```\s*$", re.S)
+
+
+# Section names are matched on these words so "Work Experience" in the
+# write-up and "Professional Experience" in the resume are the same section
+SECTION_KINDS = {
+    "summary": ("summary", "profile", "about", "objective"),
+    "experience": ("experience", "employment", "work history", "career"),
+    "skills": ("skill", "technologies", "competenc", "expertise"),
+    "education": ("education", "degree", "academic"),
+    "certifications": ("certific", "licens"),
+    "projects": ("project", "achievement", "publication"),
+}
+
+
+def _strip_code_fence(text):
+    match = CODE_FENCE.match(text)
+    return match.group(1) if match else text
+
+
+def section_kind(title):
+    """The SECTION_KINDS key a section title belongs to, or None."""
+    title = title.lower()
+    for kind, words in SECTION_KINDS.items():
+        if any(word in title for word in words):
+            return kind
+    return None
+
+
+def markdown_sections(markdown):
+    """
+    Split a markdown resume or write-up into (header, heading_level,
+    [(title, content)]).
+
+    Sections start at the heading level used by the recognised section
+    names, so job entries under "Experience" stay part of that section.
+    Without recognised names, a lone top-level heading is taken as the
+    title and the sections start below it. Everything before the first
+    section (name, title, contact details) is the header. heading_level is
+    None when there are no sections.
+    """
+    lines = markdown.splitlines()
+    headings = [
+        (index, len(match.group(1)), match.group(2))
+        for index, match in ((i, HEADING.match(line)) for i, line in enumerate(lines))
+        if match
+    ]
+    known = [(index, level) for index, level, title in headings if section_kind(title)]
+    if known:
+        first_section = known[0][0]
+        section_level = min(level for _, level in known)
+    else:
+        first_level = headings[0][1] if headings else None
+        if sum(1 for _, level, _ in headings if level == first_level) == 1:
+            headings = headings[1:]  # The candidate's name as the title
+        if not headings:
+            return markdown.strip(), None, []
+        first_section = headings[0][0]
+        section_level = min(level for _, level, _ in headings)
+
+    starts = [
+        (index, title) for index, level, title in headings
+        if index >= first_section and level <= section_level
+    ]
+    sections = [
+        (title, "\n".join(lines[index + 1:end]).strip())
+        for (index, title), end in zip(starts, [start for start, _ in starts[1:]] + [len(lines)])
+    ]
+    return "\n".join(lines[:starts[0][0]]).strip(), section_level, sections
+
+
+class StageOutput(BaseModel):
+    """A stage output the agent returns as a JSON object."""
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Validate an agent's answer. Raises ValueError (pydantic's
+        ValidationError is one) when it is not a matching JSON object.
+        """
+        text = _strip_code_fence(text.strip())
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end < start:
+            raise ValueError("No JSON object in the output")
+        return cls.model_validate_json(text[start:end + 1])
+
+    @classmethod
+    def format_instructions(cls):
+        """How the agent should shape its final answer."""
+        example = {
+            name: ["..."] if field.annotation == List[str] else "..."
+            for name, field in cls.model_fields.items()
+        }
+        return (
+            " Give your final answer as a single JSON object with these keys and "
+            f"nothing else: {json.dumps(example)}. Keep list items short."
+        )
+
+    def to_context(self):
+        """Compact text for the tasks that read this output."""
+        lines = []
+        for name, value in self:
+            label = name.replace("_", " ").capitalize()
+            if isinstance(value, list):
+                if value:
+                    lines.append(f"{label}: " + "; ".join(value))
+            elif value:
+                lines.append(f"{label}: {value}")
+        return "\n".join(lines)
+
+    @model_validator(mode="after")
+    def _not_empty(self):
+        if not any(value for _, value in self):
+            raise ValueError("The output has no content")
+        return self
+
+
+class JobRequirements(StageOutput):
+    title: str = ""
+    company: str = ""
+    skills: List[str] = []
+    experience: List[str] = []
+    qualifications: List[str] = []
+    nice_to_have: List[str] = []
+
+
+class CandidateProfile(StageOutput):
+    name: str = ""
+    headline: str = ""
+    skills: List[str] = []
+    experience: List[str] = []
+    projects: List[str] = []
+    education: List[str] = []
+    interests: List[str] = []
+    communication_style: str = ""
+
+
+class ResumeSection(BaseModel):
+    title: str
+    content: str
+
+
+class TailoredResume(BaseModel):
+    """
+    A markdown resume as its header (name, title, contact details) and
+    top-level sections.
+    """
+    header: str = ""
+    heading_level: int = 2
+    sections: List[ResumeSection]
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Split a markdown resume into sections (see markdown_sections).
+        Raises ValueError when there are no sections.
+        """
+        header, level, sections = markdown_sections(_strip_code_fence(text.strip()))
+        if not sections:
+            raise ValueError("The resume has no sections")
+        return cls(
+            header=header,
+            heading_level=level,
+            sections=[ResumeSection(title=title, content=content) for title, content in sections],
+        )
+
+    def to_markdown(self):
+        parts = [self.header] if self.header else []
+        for section in self.sections:
+            parts.append(f"{'#' * self.heading_level} {section.title}\n{section.content}".rstrip())
+        return "\n\n".join(parts) + "\n"
+
+    def to_context(self):
+        return self.to_markdown()
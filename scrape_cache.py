@@ -0,0 +1,81 @@
+import hashlib
+import os
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from extraction import EXTRACTOR_VERSION, extract_text
+from http_client import http_client
+from storage import DiskCache
+
+SCRAPE_CACHE_TTL = int(os.environ.get("SCRAPE_CACHE_TTL", 6 * 3600))
+SCRAPE_CACHE_MAX_BYTES = int(os.environ.get("SCRAPE_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+# Query parameters that only track where a visitor came from
+TRACKING_PREFIXES = ("utm_", "lever-")
+TRACKING_PARAMS = {"gh_src", "gclid", "fbclid", "ref", "trk", "trackingid"}
+
+# The browser-like headers crewai_tools' ScrapeWebsiteTool sends, so pages
+# fetched outside a crew (match scores, prefetched postings) look the same
+# without importing the crew stack
+SCRAPE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://www.google.com/',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Accept-Encoding': 'gzip, deflate, br'
+}
+
+scrape_cache = DiskCache("scrape", ttl=SCRAPE_CACHE_TTL, max_bytes=SCRAPE_CACHE_MAX_BYTES)
+
+
+def normalize_url(url):
+    """
+    Canonical form of a URL for cache lookups: lower-case scheme and host,
+    no fragment, no tracking parameters, sorted query and no trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PREFIXES) and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def cache_key(url):
+    key = f"{EXTRACTOR_VERSION}:{normalize_url(url)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def fetch_page(url, headers=None, cookies=None):
+    """
+    Return (text, ok): the main content of a web page as compact text (see
+    extraction.py), from the scrape cache if possible, and whether the
+    server answered with a success status.
+
+    Only successful responses are cached, so a transient error page does
+    not stick around for the whole TTL.
+    """
+    key = cache_key(url)
+    cached = scrape_cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    page = http_client.get(
+        url,
+        timeout=15,
+        headers=headers if headers is not None else SCRAPE_HEADERS,
+        cookies=cookies if cookies else {}
+    )
+    text = extract_text(page.content, url)
+
+    if page.ok:
+        scrape_cache.set(key, text)
+    return text, page.ok
+
+
+def fetch_page_text(url, headers=None, cookies=None):
+    """Like fetch_page(), for callers that want the text whatever the status."""
+    return fetch_page(url, headers, cookies)[0]
+
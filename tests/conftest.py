@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+import types
+
+import pytest
+
+# Caches are created at import time under DATA_DIR; keep them out of the repo
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="crew-tests-"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+class _Task:
+    def __init__(self, output):
+        self.output = types.SimpleNamespace(raw_output=output)
+
+
+@pytest.fixture
+def crew_runs(monkeypatch):
+    """
+    Replace the crew with one that finishes every requested stage, reporting
+    research as taken from the requirements cache. Returns the list of
+    stages each run was asked for.
+    """
+    import app
+    from crew_specs import ALL_STAGES
+
+    runs = []
+
+    def run_crew(job_posting_url, linkedin_url, personal_writeup, resume_path, semantic_search_resume,
+                 config, emit=None, completed=None, stages=ALL_STAGES, pipeline="strict", notes=None):
+        runs.append([stage for stage in stages if stage not in (completed or {})])
+        outputs = dict(completed or {})
+        for stage in stages:
+            if stage not in outputs:
+                outputs[stage] = (
+                    f"# {stage}\n\n## Summary\n{personal_writeup}\n\n## Posting\n{job_posting_url}\n"
+                )
+                if emit:
+                    emit("task_finished", {
+                        "stage": stage, "output": outputs[stage], "cached": stage == "research"
+                    })
+        return {stage: _Task(output) for stage, output in outputs.items()}
+
+    monkeypatch.setattr(app, "_run_crew", run_crew)
+    monkeypatch.setattr(app, "_request_config", lambda params: types.SimpleNamespace(
+        llm_provider=params['llm_provider'], model_name=params.get('model_name')
+    ))
+    monkeypatch.setitem(sys.modules, "resume_index", types.SimpleNamespace(
+        build_resume_search_tool=lambda writeup, api_key: None
+    ))
+    return runs
@@ -0,0 +1,13 @@
+from analysis_cache import requirements_key
+
+
+def test_same_text_on_different_postings_gets_different_keys():
+    shell = "Loading..."
+    assert requirements_key("https://jobs.example.com/a", shell, "openai", None) != \
+        requirements_key("https://jobs.example.com/b", shell, "openai", None)
+
+
+def test_key_ignores_tracking_parameters():
+    text = "Senior engineer, Python"
+    assert requirements_key("https://jobs.example.com/a?utm_source=x", text, "openai", "gpt-4") == \
+        requirements_key("https://JOBS.example.com/a/", text, "openai", "gpt-4")
@@ -0,0 +1,59 @@
+import app
+from crew_specs import ALL_STAGES
+
+
+def _params(request_id, **overrides):
+    params, error = app._parse_request(dict({
+        "openaiApiKey": "sk-test",
+        "serperApiKey": "serper-test",
+        "jobPostingUrl": "https://jobs.example.com/1",
+        "linkedinUrl": "https://linkedin.com/in/someone",
+        "personalWriteup": "Backend engineer who likes Python.",
+        "requestId": request_id,
+    }, **overrides), batch="jobPostingUrls" in overrides)
+    assert error is None
+    return params
+
+
+def test_retry_resumes_a_run_whose_research_was_cached(crew_runs):
+    params = _params("retry-cached-research")
+    first = app.run_job_application_crew(params)
+    again = app.run_job_application_crew(params)
+
+    assert crew_runs == [list(ALL_STAGES)]
+    assert again["researchNotes"] == first["researchNotes"]
+    assert again["resultId"] == first["resultId"]
+
+
+def test_batch_retry_resumes_postings_whose_research_was_cached(crew_runs):
+    urls = ["https://jobs.example.com/1", "https://jobs.example.com/2"]
+    params = _params("retry-cached-batch", jobPostingUrls=urls)
+    first = app.run_batch(params)
+    again = app.run_batch(params)
+
+    assert [result["status"] for result in again["results"]] == ["success", "success"]
+    assert len(crew_runs) == 1 + len(urls)
+    assert again["resultId"] == first["resultId"]
+
+
+def test_only_submissions_with_the_same_api_key_are_coalesced():
+    params = _params("dedupe-by-key")
+    same = _params("dedupe-by-key")
+    other_key = _params("dedupe-by-key", openaiApiKey="sk-someone-else")
+
+    key = app._dedupe_key(app.run_job_application_crew, params)
+    assert app._dedupe_key(app.run_job_application_crew, same) == key
+    assert app._dedupe_key(app.run_job_application_crew, other_key) != key
+
+
+def test_unknown_llm_provider_is_rejected():
+    response = app.app.test_client().post("/api/jobs", json={
+        "llmProvider": "foo",
+        "openaiApiKey": "sk-test",
+        "serperApiKey": "serper-test",
+        "jobPostingUrl": "https://jobs.example.com/1",
+        "linkedinUrl": "https://linkedin.com/in/someone",
+        "personalWriteup": "Backend engineer who likes Python.",
+    })
+    assert response.status_code == 400
+    assert response.json["error"] == "Invalid LLM provider"
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from extraction import MIN_CONTENT_CHARS, estimate_tokens, extract_text
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "fixtures")
+
+LEVER_URL = "https://jobs.lever.co/aifund/6c82e23e-d954-4dd8-a734-c0c2c5ee00f1"
+GREENHOUSE_URL = "https://boards.greenhouse.io/northwindlabs/jobs/4412309"
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return f.read()
+
+
+def test_lever_posting():
+    text = extract_text(read_fixture("job_posting.html"), LEVER_URL)
+    assert text.startswith("## Full Stack Engineer\nPalo Alto, CA / Remote\n")
+    assert "About AI Fund" in text
+    assert "Apply for this job" not in text
+
+
+def test_greenhouse_posting():
+    text = extract_text(read_fixture("greenhouse_posting.html"), GREENHOUSE_URL)
+    assert text.startswith("## Senior Backend Engineer, Platform\nat Northwind Labs\n")
+    assert "- Design, build and operate" in text
+    assert "Apply for this Job" not in text
+    assert "Back to jobs" not in text
+
+
+def test_site_extractors_only_apply_to_their_hosts():
+    html = read_fixture("greenhouse_posting.html")
+    assert extract_text(html, "https://greenhouse.io.example.com/jobs/1") != extract_text(html, GREENHOUSE_URL)
+
+
+def test_other_pages_get_their_main_content_and_title():
+    text = extract_text(read_fixture("profile.html"), "https://github.com/noah-williams")
+    assert text.startswith("# noah-williams (Noah Williams)")
+    assert "I lead engineering at DataKernel" in text
+    assert len(text) >= MIN_CONTENT_CHARS
+
+
+def test_repeated_blocks_are_dropped():
+    html = "<main>" + "<p>Build and operate services that scale well.</p>" * 3 + "<p>" + "word " * 60 + "</p></main>"
+    assert extract_text(html).count("Build and operate") == 1
+
+
+@pytest.mark.parametrize("name, url", [
+    ("job_posting.html", LEVER_URL),
+    ("greenhouse_posting.html", GREENHOUSE_URL),
+    ("profile.html", None),
+])
+def test_token_budget(name, url):
+    html = read_fixture(name)
+    full = extract_text(html, url, token_budget=0)
+    cut = extract_text(html, url, token_budget=100)
+    assert estimate_tokens(cut) <= 100
+    assert cut.endswith("\n[...]")
+    assert full.startswith(cut[:-len("[...]")])
+    # A line costs its tokens plus one for the newline
+    needed = sum(estimate_tokens(line) + 1 for line in full.splitlines())
+    assert extract_text(html, url, token_budget=needed) == full
+    assert extract_text(html, url, token_budget=needed - 1).endswith("\n[...]")
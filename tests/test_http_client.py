@@ -0,0 +1,41 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_client import HttpClient
+
+
+class CookieEchoHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = json.dumps({"cookie": self.headers.get("Cookie")}).encode("utf-8")
+        self.send_response(200)
+        if self.path == "/login":
+            self.send_header("Set-Cookie", "session=someone-else; Path=/")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CookieEchoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_cookies_do_not_carry_over_between_requests(server_url):
+    client = HttpClient()
+    client.get(f"{server_url}/login")
+    assert client.get(f"{server_url}/profile").json() == {"cookie": None}
+    assert len(client.session.cookies) == 0
+
+
+def test_per_request_cookies_are_sent(server_url):
+    client = HttpClient()
+    assert client.get(f"{server_url}/profile", cookies={"li_at": "token"}).json() == {"cookie": "li_at=token"}
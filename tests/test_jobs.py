@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+
+from jobs import ClientLimiter, JobQueue, QueueFullError, QuotaExceededError
+
+
+def _blocking(gate):
+    def run(params, emit):
+        gate.wait(5)
+        return {"params": params}
+    return run
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def test_resume_key_reattaches_only_to_the_same_run():
+    gate = threading.Event()
+    queue = JobQueue(workers=1, quota_per_key=0)
+    first = queue.submit(_blocking(gate), {"user": "a"}, resume_key="run-a")
+    again = queue.submit(_blocking(gate), {"user": "a"}, resume_key="run-a")
+    other = queue.submit(_blocking(gate), {"user": "b"}, resume_key="run-b")
+    gate.set()
+
+    assert again is first
+    assert other is not first
+    assert first.id != "run-a"
+    assert other.wait(5) and other.result == {"params": {"user": "b"}}
+
+
+def test_failed_job_is_replaced_on_retry():
+    queue = JobQueue(workers=1, quota_per_key=0)
+
+    def fail(params, emit):
+        raise RuntimeError("boom")
+
+    failed = queue.submit(fail, {}, resume_key="run")
+    assert failed.wait(5) and failed.status == "failed"
+    retried = queue.submit(lambda params, emit: {}, {}, resume_key="run")
+    assert retried is not failed
+    assert retried.wait(5) and retried.status == "succeeded"
+
+
+def test_client_limiter_budgets_each_client():
+    limiter = ClientLimiter("test", max_concurrent=10, rate=0.001, burst=3)
+    with limiter.admit("a", cost=3):
+        pass
+    with pytest.raises(QuotaExceededError) as rejected:
+        with limiter.admit("a"):
+            pass
+    assert rejected.value.retry_after >= 1
+    with limiter.admit("b", cost=2):
+        pass
+
+
+def test_client_limiter_caps_concurrency():
+    limiter = ClientLimiter("test", max_concurrent=1, rate=10, burst=10)
+    with limiter.admit("a"):
+        with pytest.raises(QueueFullError):
+            with limiter.admit("b"):
+                pass
+    with limiter.admit("b"):
+        pass
+
+
+def test_batch_crews_share_the_crew_cap_with_interactive_jobs():
+    queue = JobQueue(workers=2, batch_workers=1, quota_per_key=0)
+    lock = threading.Lock()
+    active, peak = [0], [0]
+    release = threading.Event()
+
+    def crew():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        release.wait(5)
+        with lock:
+            active[0] -= 1
+
+    def interactive(params, emit):
+        crew()
+
+    def batch(params, emit):
+        def posting():
+            with queue.crew_slot():
+                crew()
+        threads = [threading.Thread(target=posting) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    jobs = [queue.submit(batch, {}, priority="batch"), queue.submit(interactive, {})]
+    threading.Timer(0.3, release.set).start()
+    for job in jobs:
+        assert job.wait(10) and job.status == "succeeded"
+    assert peak[0] == 2
+    assert queue.crew_count() == 0
+
+
+def test_interactive_jobs_start_before_queued_batches():
+    gate = threading.Event()
+    order = []
+
+    def job(name):
+        def run(params, emit):
+            order.append(name)
+            gate.wait(5)
+        return run
+
+    queue = JobQueue(workers=2, batch_workers=1, quota_per_key=0)
+    jobs = [queue.submit(job("batch-1"), {}, priority="batch"),
+            queue.submit(job("batch-2"), {}, priority="batch")]
+    jobs += [queue.submit(job("single-1"), {}), queue.submit(job("single-2"), {})]
+    gate.set()
+    for submitted in jobs:
+        assert submitted.wait(5)
+    assert order.index("batch-2") > order.index("single-2")
+
+
+def test_admission_rejects_full_queues_and_busy_keys():
+    gate = threading.Event()
+    queue = JobQueue(workers=1, max_pending=3, batch_workers=1, max_batch_pending=1,
+                     quota_per_key=2)
+    jobs = [queue.submit(_blocking(gate), {}, quota_key="a")]
+    _wait_until(lambda: queue.running_count() == 1)
+    jobs.append(queue.submit(_blocking(gate), {}, quota_key="a"))
+    with pytest.raises(QuotaExceededError) as busy_key:
+        queue.submit(_blocking(gate), {}, quota_key="a")
+    assert busy_key.value.retry_after >= 1
+
+    jobs.append(queue.submit(_blocking(gate), {}, priority="batch", quota_key="b"))
+    with pytest.raises(QueueFullError):
+        queue.submit(_blocking(gate), {}, priority="batch", quota_key="c")
+    jobs.append(queue.submit(_blocking(gate), {}, quota_key="d"))
+    with pytest.raises(QueueFullError):
+        queue.submit(_blocking(gate), {}, quota_key="e")
+
+    gate.set()
+    for job in jobs:
+        assert job.wait(5) and job.status == "succeeded"
+    assert queue.submit(_blocking(gate), {}, quota_key="a").wait(5)
@@ -0,0 +1,60 @@
+import pytest
+
+import app
+from match_score import SKILL_NAMES, score_posting, skill_counts
+
+
+def skills(text):
+    return {SKILL_NAMES[index]: int(count) for index, count in enumerate(skill_counts(text)) if count}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Java and JavaScript", {"Java": 1, "JavaScript": 1}),
+    ("We write javascript daily", {"JavaScript": 1}),
+    ("Strong Java.", {"Java": 1}),
+    ("C#/.NET developer", {"C#": 2}),
+    ("Served from example.net", {}),
+    ("c++ and cpp", {"C++": 2}),
+    ("node.js and React.js", {"Node.js": 1, "React": 1}),
+    ("Python, Go and Rust", {"Python": 1, "Go": 1, "Rust": 1}),
+    ("Go/Rust", {"Go": 1, "Rust": 1}),
+    ("Ready to go the extra mile", {}),
+    ("Go is where we started", {}),
+])
+def test_skill_aliases(text, expected):
+    assert skills(text) == expected
+
+
+def test_score_weighs_skills_by_mentions():
+    match = score_posting("Python and Java developer", "We need Python, Go and Java. Python again.")
+    assert match["matchedSkills"] == ["Python", "Java"]
+    assert match["missingSkills"] == ["Go"]
+    assert 0 < match["score"] < 100
+    assert score_posting("Python", "No skills named here")["score"] == 0
+
+
+def test_failed_fetches_are_reported_per_posting(monkeypatch):
+    def fetch_page(url):
+        if url.endswith("/gone"):
+            return "Not Found", False
+        if url.endswith("/down"):
+            raise ConnectionError("connection refused")
+        return "We need Python and Go/Rust.", True
+
+    monkeypatch.setattr(app, "fetch_page", fetch_page)
+    response = app.app.test_client().post("/api/match-score", json={
+        "personalWriteup": "Python developer",
+        "jobPostingUrls": [
+            "https://jobs.example.com/ok", "https://jobs.example.com/gone", "https://jobs.example.com/down",
+        ],
+    })
+
+    assert response.status_code == 200
+    ok, gone, down = response.json["results"]
+    assert (ok["status"], ok["matchedSkills"]) == ("success", ["Python"])
+    assert gone == {
+        "status": "failed",
+        "message": "The job posting page answered with an error",
+        "jobPostingUrl": "https://jobs.example.com/gone",
+    }
+    assert (down["status"], down["message"]) == ("failed", "connection refused")
@@ -0,0 +1,88 @@
+import gzip
+
+import pytest
+
+from app import app
+from results import store_result
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.fixture
+def result_id():
+    return store_result({
+        "status": "success",
+        "tailoredResume": "# Jane\n\n## Skills\n- Python\n" * 100,
+        "provider": "openai",
+    })
+
+
+@pytest.fixture
+def batch_id():
+    return store_result({
+        "status": "success",
+        "profile": "Backend engineer",
+        "results": [{"status": "success", "jobPostingUrl": f"https://jobs.example.com/{i}"} for i in range(25)],
+        "provider": "openai",
+    })
+
+
+def test_result_is_served_with_its_id_as_etag(client, result_id):
+    response = client.get(f"/api/results/{result_id}")
+    assert response.status_code == 200
+    assert response.get_etag() == (result_id, False)
+    assert response.json["resultId"] == result_id
+    assert "immutable" in response.headers["Cache-Control"]
+
+
+@pytest.mark.parametrize("if_none_match", ['"{id}"', 'W/"{id}"', '"other", "{id}-gzip"', 'W/"{id}-br"'])
+def test_known_etags_get_not_modified(client, result_id, if_none_match):
+    response = client.get(
+        f"/api/results/{result_id}", headers={"If-None-Match": if_none_match.format(id=result_id)}
+    )
+    assert response.status_code == 304
+    assert response.get_data() == b""
+
+
+def test_other_etags_get_the_result(client, result_id):
+    response = client.get(f"/api/results/{result_id}", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_compressed_result_gets_an_etag_per_encoding(client, result_id):
+    response = client.get(f"/api/results/{result_id}/resume", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.get_etag() == (f"{result_id}-resume-gzip", False)
+    assert gzip.decompress(response.get_data()).decode("utf-8").startswith("# Jane\n")
+
+    again = client.get(
+        f"/api/results/{result_id}/resume",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]}
+    )
+    assert again.status_code == 304
+
+
+def test_unknown_results_and_artifacts(client, result_id):
+    assert client.get(f"/api/results/{'0' * 64}").status_code == 404
+    assert client.get("/api/results/not-an-id").status_code == 404
+    assert client.get(f"/api/results/{result_id}/cover-letter").status_code == 404
+    assert client.get(f"/api/results/{result_id}/interview-materials").status_code == 404
+    assert client.get(f"/api/results/{result_id}/postings").status_code == 404
+
+
+def test_batch_postings_are_paged(client, batch_id):
+    page = client.get(f"/api/results/{batch_id}/postings?offset=20&limit=10").json
+    assert (page["offset"], page["limit"], page["total"]) == (20, 10, 25)
+    assert [posting["jobPostingUrl"] for posting in page["postings"]] == [
+        f"https://jobs.example.com/{i}" for i in range(20, 25)
+    ]
+
+    first = client.get(f"/api/results/{batch_id}/postings")
+    assert len(first.json["postings"]) == 10
+    assert first.get_etag() == (f"{batch_id}-postings-0-10", False)
+    assert client.get(f"/api/results/{batch_id}/postings?limit=500").json["limit"] == 50
+    assert client.get(f"/api/results/{batch_id}/postings?offset=x").status_code == 400
@@ -0,0 +1,60 @@
+import os
+
+from retailor import HEADER, diff_sections, merge_sections, session_key, split_sections
+
+FAKE_RESUME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fake_resume.md")
+
+
+def test_session_is_bound_to_the_submitter():
+    args = ("https://jobs.example.com/1", "https://linkedin.com/in/someone", "openai", None)
+    assert session_key(*args, "owner-a") == session_key(*args, "owner-a")
+    assert session_key(*args, "owner-a") != session_key(*args, "owner-b")
+
+
+def test_split_sections_of_fake_resume():
+    with open(FAKE_RESUME) as f:
+        sections = split_sections(f.read())
+    assert list(sections) == [
+        HEADER, "summary", "skills", "experience", "education", "certifications", "projects",
+    ]
+    assert sections["skills"].startswith("### Skills\n")
+
+
+def test_diff_and_merge_only_touch_changed_sections():
+    old = "# Jane\n\n## Summary\nBackend engineer.\n\n## Skills\n- Python\n\n## Education\nBSc\n"
+    new = "# Jane\n\n## Summary\nBackend engineer.\n\n## Skills\n- Python\n- Go\n\n## Awards\nPrize\n"
+    changed, removed = diff_sections(old, new)
+    assert changed == ["skills", "awards"]
+    assert removed == ["education"]
+
+    tailored = "# Jane\n\n## Summary\nTailored summary.\n\n## Skills\n- Python\n\n## Education\nBSc\n"
+    rewritten = "## Skills\n- Python, Go\n\n## Awards\nPrize\n"
+    merged = merge_sections(tailored, rewritten, changed, removed)
+    assert merged == (
+        "# Jane\n\n## Summary\nTailored summary.\n\n## Skills\n- Python, Go\n\n## Awards\nPrize\n"
+    )
+
+
+def test_free_text_writeup_edit_rewrites_the_whole_resume(crew_runs):
+    import app
+
+    def run(writeup):
+        params, error = app._parse_request({
+            "openaiApiKey": "sk-test",
+            "serperApiKey": "serper-test",
+            "jobPostingUrl": "https://jobs.example.com/free-text",
+            "linkedinUrl": "https://linkedin.com/in/someone",
+            "personalWriteup": writeup,
+            "retailor": True,
+        })
+        assert error is None
+        return app.run_job_application_crew(params)
+
+    run("Backend engineer. I like Python.")
+    result = run("Backend engineer. I like Python and Go.")
+
+    assert crew_runs[-1] == ["resume_strategy"]
+    assert split_sections(result["tailoredResume"])["summary"] == (
+        "## Summary\nBackend engineer. I like Python and Go."
+    )
+    assert result["retailoredSections"] == [HEADER, "summary", "posting"]
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from schemas import JobRequirements, TailoredResume
+
+FAKE_RESUME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fake_resume.md")
+
+
+def read_fake_resume():
+    with open(FAKE_RESUME) as f:
+        return f.read()
+
+
+def test_fake_resume_sections():
+    resume = TailoredResume.parse(read_fake_resume())
+    assert resume.header.startswith("# Noah Thompson\n## Senior Software Engineering Leader")
+    assert resume.heading_level == 3
+    assert [section.title for section in resume.sections] == [
+        "Professional Summary", "Skills", "Work Experience", "Education", "Certifications",
+        "Projects & Achievements",
+    ]
+    experience = resume.sections[2].content
+    assert "#### Chief Technology Officer | TechInnovate Inc." in experience
+    assert "#### Senior Software Engineer | InnovateTech" in experience
+
+
+def test_resume_round_trips_through_markdown():
+    resume = TailoredResume.parse(read_fake_resume())
+    assert TailoredResume.parse(resume.to_markdown()) == resume
+
+
+def test_lone_title_without_known_sections_is_header():
+    resume = TailoredResume.parse("# Jane Doe\n\n## Intro\nHello\n\n## Outro\nBye\n")
+    assert resume.header == "# Jane Doe"
+    assert [section.title for section in resume.sections] == ["Intro", "Outro"]
+
+
+def test_resume_without_sections_is_rejected():
+    with pytest.raises(ValueError):
+        TailoredResume.parse("Just a paragraph.")
+
+
+def test_stage_output_parses_fenced_json():
+    parsed = JobRequirements.parse('```json\n{"title": "Engineer", "skills": ["Python"]}\n```')
+    assert parsed.title == "Engineer"
+    assert parsed.to_context() == "Title: Engineer\nSkills: Python"
+
+
+def test_empty_stage_output_is_rejected():
+    with pytest.raises(ValueError):
+        JobRequirements.parse("{}")